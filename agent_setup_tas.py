@@ -6,88 +6,196 @@
 # 3. ICA condition requirements
 
 import os
+import asyncio
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from dotenv import load_dotenv
-from langchain.agents import initialize_agent, AgentType
-from langchain_google_genai import ChatGoogleGenerativeAI
-from tas_tools import fruit_fly_tool
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from tas_tools import fruit_fly_tool, fruit_fly_answer_tool, fast_path, question_scope
+from cache import LLMCache, CachedAgent
+from tas_constants import GENERIC_TAS_FOOTER
+
+# The agent and Gemini client libraries are slow to import, so they are only loaded
+# when the agent is first built; fast-path answers never need them
+if TYPE_CHECKING:
+    from langchain.agents import AgentExecutor
 
 # Load environment variables
 load_dotenv()
 
-# Generic footer that must be appended to all responses
-# This ensures users are always reminded of the baseline requirements
-GENERIC_TAS_FOOTER = (
-    "⚠️  **Pre-entry paperwork (PBM-Tas §2.2)**\n"
-    "• Lodge a *Notice of Intention (NoI) to Import* with Biosecurity Tasmania at least **24 h before the consignment arrives**; and\n"
-    "• If required, attach an acceptable Plant Health Certificate, PHAC or equivalent phytosanitary certificate.\n\n"
-    "Commodity-specific conditions (see above) apply on top of these baseline rules."
+# Model used for the agent (also part of the response cache key)
+# Flash is fast enough for routing to the tool; the deterministic lookup happens in Python
+MODEL_NAME = "gemini-2.0-flash"
+
+# Slower, stronger model used only when the primary model's run fails
+# (e.g. its tool call does not pass schema validation)
+FALLBACK_MODEL_NAME = "gemini-1.5-pro"
+
+# Version of the agent prompt. Bump this whenever AGENT_PREFIX changes so that
+# cached answers produced with the old prompt are no longer reused.
+PROMPT_VERSION = "v5"
+
+# The tools available to the agent
+# fruit_fly_answer_tool returns directly, so its structured arguments become the final answer
+TOOLS = [fruit_fly_tool, fruit_fly_answer_tool]
+
+# Detailed prompt that configures the agent's behavior
+AGENT_PREFIX = (
+    "You are PlantPassport.ai, a regulatory assistant for **Tasmania fruit fly conditions only**.\n\n"
+    "**STRUCTURED APPROACH**: Always analyze queries using these 3 key variables:\n"
+    "1. **COMMODITY**: Identify the specific commodity (e.g., 'table grapes', 'apples', 'citrus')\n"
+    "2. **DESTINATION**: Always Tasmania (this is fixed for this system)\n"
+    "3. **ORIGIN**: The state/territory of origin (e.g., 'NSW', 'Victoria', 'WA') - this is CRITICAL for fruit fly assessment\n\n"
+    "**FRUIT FLY ASSESSMENT PROCESS**:\n"
+    "1. Extract the commodity and origin state from the user query\n"
+    "2. Call the fruit_fly_assessment tool with both commodity and origin state\n"
+    "3. **FINALLY**: Call the fruit_fly_answer tool with the host status, risk details, ICA conditions, "
+    "treatments and documents from the assessment - the answer is formatted automatically\n\n"
+    "**IMPORTANT DECISION RULES**:\n"
+    "- Origin state is CRITICAL - different states have different fruit fly profiles\n"
+    "- QFF is present in QLD, NSW, VIC, NT, and parts of SA\n"
+    "- MFF is present in WA and parts of SA\n"
+    "- Tasmania is free from both fruit flies\n"
+    "- If origin information is missing, ask for clarification instead of calling the tools\n"
+    "- Never write the formatted answer yourself - always finish with the fruit_fly_answer tool"
 )
 
-# Initialize the agent with specific configuration
-agent = initialize_agent(
-    # The fruit_fly_tool provides access to the fruit fly database and assessment
-    tools=[fruit_fly_tool],
-    
-    # Use Gemini Pro for consistent, factual responses
-    llm=ChatGoogleGenerativeAI(
-        model="gemini-1.5-pro",
-        temperature=0,
-        convert_system_message_to_human=True  # Gemini doesn't support system messages directly
-    ),
-    
-    # Use the ZERO_SHOT_REACT_DESCRIPTION agent type
+# The prefix is kept byte-identical across calls so Gemini can reuse it through its
+# implicit prompt caching. An explicit context cache is not used: the prefix is far
+# below its minimum size, and cached content cannot be combined with per-call tools.
+
+
+def _agent_prefix() -> str:
+    """
+    Return the prefix actually sent to the model.
+    With TAS_COMPRESS_PREFIX=1 the prefix is compressed with LLMLingua (needs llmlingua).
+    """
+    if os.getenv("TAS_COMPRESS_PREFIX") == "1":
+        from prompt_compression import compress_prefix
+        return compress_prefix(AGENT_PREFIX)
+    return AGENT_PREFIX
+
+
+def _build_executor(model_name: str, prefix: str) -> "AgentExecutor":
+    """Create a tool-calling agent executor for a Gemini model."""
+    from langchain.agents import AgentExecutor, create_tool_calling_agent
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    # Temperature 0 for consistent, factual responses
+    llm = ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=0
+    )
+
+    # Configure the agent's behavior with the detailed prompt above
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", prefix),
+        ("human", "{input}"),
+        MessagesPlaceholder("agent_scratchpad")
+    ])
+
+    # Use a native tool-calling agent
     # This allows the agent to:
-    # 1. Reason about the query without examples
-    # 2. Use the ReAct framework (Reason + Act)
+    # 1. Call the fruit_fly_tool with structured, schema-validated arguments
+    # 2. Skip the free-text Thought/Action/Observation scaffolding of ReAct
     # 3. Generate structured responses
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    
-    # Enable verbose output for debugging
-    verbose=True,
-    
-    # Configure the agent's behavior with a detailed prompt
-    agent_kwargs={
-        "prefix": (
-            "You are PlantPassport.ai, a regulatory assistant for **Tasmania fruit fly conditions only**.\n\n"
-            "**STRUCTURED APPROACH**: Always analyze queries using these 3 key variables:\n"
-            "1. **COMMODITY**: Identify the specific commodity (e.g., 'table grapes', 'apples', 'citrus')\n"
-            "2. **DESTINATION**: Always Tasmania (this is fixed for this system)\n"
-            "3. **ORIGIN**: The state/territory of origin (e.g., 'NSW', 'Victoria', 'WA') - this is CRITICAL for fruit fly assessment\n\n"
-            "**FRUIT FLY ASSESSMENT PROCESS**:\n"
-            "1. Extract the commodity and origin state from the user query\n"
-            "2. **FIRST**: Check if the commodity is a fruit fly host (QFF or MFF)\n"
-            "3. **THEN**: Check if the origin state has the relevant fruit fly present\n"
-            "4. **FINALLY**: Determine appropriate ICA conditions and treatment requirements\n\n"
-            "**RESPONSE FORMAT**:\n"
-            "**Commodity**: [Commodity Name]\n"
-            "**Origin**: [State/Territory]\n"
-            "**Destination**: Tasmania\n\n"
-            "**Fruit Fly Host Status**:\n"
-            "• QFF host: YES/NO\n"
-            "• MFF host: YES/NO\n\n"
-            "**Risk Assessment**:\n"
-            "• [Risk details or 'No risk detected']\n\n"
-            "**Required ICA Conditions**:\n"
-            "• [List applicable ICAs and conditions]\n\n"
-            "**Treatment Requirements**:\n"
-            "• [List treatment options]\n\n"
-            "**Documentation Required**:\n"
-            "• [List required certificates and paperwork]\n\n"
-            "**⚠️ Pre-entry Requirements**:\n"
-            "[Always include the generic footer]\n\n"
-            "**IMPORTANT DECISION RULES**:\n"
-            "- Origin state is CRITICAL - different states have different fruit fly profiles\n"
-            "- QFF is present in QLD, NSW, VIC, NT, and parts of SA\n"
-            "- MFF is present in WA and parts of SA\n"
-            "- Tasmania is free from both fruit flies\n"
-            "- If origin information is missing, ask for clarification\n"
-            "- Use clear formatting with bullet points and section headers\n"
-            "- Always call the fruit_fly_assessment tool with both commodity and origin state"
+    return AgentExecutor(
+        # The fruit_fly_tool provides access to the fruit fly database and assessment
+        agent=create_tool_calling_agent(llm, TOOLS, prompt),
+        tools=TOOLS,
+        
+        # Enable verbose output for debugging
+        verbose=True
+    )
+
+
+def _build_agent() -> CachedAgent:
+    """Create the LangChain agent and wrap it with the response caches."""
+    prefix = _agent_prefix()
+
+    # Retry with the fallback model only if the primary model's run raises
+    agent = _build_executor(MODEL_NAME, prefix).with_fallbacks(
+        [_build_executor(FALLBACK_MODEL_NAME, prefix)]
+    )
+
+    # Optionally put a semantic cache in front of the agent so paraphrased questions
+    # reuse a previous answer (set TAS_SEMANTIC_CACHE=1, needs sentence-transformers).
+    # Answers are only reused for questions naming the same states and commodities.
+    base_agent = agent
+    if os.getenv("TAS_SEMANTIC_CACHE") == "1":
+        from semantic_cache import SemanticCachedAgent, get_semantic_cache
+        base_agent = SemanticCachedAgent(
+            agent,
+            get_semantic_cache(MODEL_NAME, [tool.name for tool in TOOLS], PROMPT_VERSION),
+            scope_fn=question_scope
         )
-    }
-)
+
+    # Wrap the agent with an exact-match response cache so repeated questions
+    # are answered without another LLM call
+    return CachedAgent(
+        base_agent,
+        LLMCache(),
+        model_name=MODEL_NAME,
+        prefix=prefix,
+        tools=TOOLS,
+        temperature=0,
+        prompt_version=PROMPT_VERSION
+    )
+
+
+class FastPathAgent:
+    """
+    Answers questions that name exactly one known commodity and origin state
+    straight from the fruit fly database, and only calls the LLM agent otherwise.
+    The generic footer is appended to every answer here rather than generated by the LLM.
+    """
+
+    def __init__(self, agent: Any):
+        self.agent = agent
+
+    def invoke(self, input: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer via the fast path if possible, otherwise call the agent."""
+        answer = fast_path(input["input"])
+        if answer is not None:
+            result = {"input": input["input"], "output": answer}
+        else:
+            result = self.agent.invoke(input)
+        return self._with_footer(result)
+
+    async def ainvoke(self, input: Dict[str, Any]) -> Dict[str, Any]:
+        """Async version of invoke(), so one worker can serve many concurrent questions."""
+        answer = fast_path(input["input"])
+        if answer is not None:
+            result = {"input": input["input"], "output": answer}
+        else:
+            result = await self.agent.ainvoke(input)
+        return self._with_footer(result)
+
+    @staticmethod
+    def _with_footer(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Append the generic footer to an agent result."""
+        return {**result, "output": result["output"] + "\n\n" + GENERIC_TAS_FOOTER}
+
+
+# The agent is created on first use so importing this module stays cheap
+_agent: Optional[FastPathAgent] = None
+
+def get_agent() -> FastPathAgent:
+    """Return the shared agent, creating it on first use."""
+    global _agent
+    if _agent is None:
+        _agent = FastPathAgent(_build_agent())
+    return _agent
+
+async def handle(query: str) -> Dict[str, Any]:
+    """Answer a single question asynchronously."""
+    return await get_agent().ainvoke({"input": query})
+
+
+async def handle_batch(queries: List[str]) -> List[Dict[str, Any]]:
+    """Answer several questions concurrently (e.g. for batch or offline scoring)."""
+    return await asyncio.gather(*[handle(query) for query in queries])
 
 # Example usage
 if __name__ == '__main__':
     # Test the agent with a sample query - edit the line below to test different queries
-    print(agent.invoke({"input": "I want to bring strawberry fruit from QLD into Tasmania."}))
+    print(get_agent().invoke({"input": "I want to bring strawberry fruit from QLD into Tasmania."}))
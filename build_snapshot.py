@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Build the fruit fly database snapshot (data/pests.pkl).
+Run this after editing data/pests.json so the agent can load the prebuilt
+indexes directly instead of parsing and indexing the JSON on every start.
+"""
+
+from tas_data import FruitFlyDatabase, SNAPSHOT_PATH
+
+def main():
+    """Build the database from pests.json and save the snapshot."""
+    db = FruitFlyDatabase(use_snapshot=False)
+    db.save_snapshot(SNAPSHOT_PATH)
+    print(f"✅ Snapshot saved to {SNAPSHOT_PATH} ({len(db.commodities)} commodities)")
+
+if __name__ == "__main__":
+    main()
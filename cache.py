@@ -0,0 +1,170 @@
+# cache.py
+# This file provides an exact-match response cache for the LangChain agent.
+# Answers are stored in a local SQLite database keyed by a SHA-256 hash of everything
+# that can influence the response (model, prompt prefix, tool set and user input), so a
+# repeated question is answered without another LLM round-trip.
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Default location of the cache database (created on first use)
+CACHE_PATH = "tas_llm_cache.sqlite"
+
+# Cached answers expire after 7 days so changes to the underlying data are picked up
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+class LLMCache:
+    """SQLite-backed exact-match cache for deterministic (temperature 0) LLM responses."""
+
+    def __init__(self, path: str = CACHE_PATH, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        """Open (or create) the cache database."""
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+        # The connection is shared with the worker threads used by aget/aset without
+        # aiosqlite, so each statement and its commit run under this lock
+        self._lock = threading.Lock()
+
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "hash TEXT PRIMARY KEY, "
+            "response TEXT NOT NULL, "
+            "prompt_version TEXT, "
+            "created_at INTEGER, "
+            "expires_at INTEGER)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def cache_key(model: str, messages: List[Any], temperature: float,
+                  tools: List[str], prompt_version: str = "") -> Optional[str]:
+        """
+        Build the cache key for a request.
+        Returns None when the request is not deterministic (temperature > 0) and
+        therefore must not be cached.
+        """
+        if temperature > 0:
+            return None
+
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "tools": tools,
+            "prompt_version": prompt_version,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response for a key, or None if missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE hash = ? AND expires_at > ?",
+                (key, int(time.time())),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, response: Any, prompt_version: str = "") -> None:
+        """Store a response under a key, replacing any previous entry."""
+        now = int(time.time())
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (hash, response, prompt_version, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(response), prompt_version, now, now + self.ttl_seconds),
+            )
+            self._conn.commit()
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Async version of get() that does not block the event loop."""
+        try:
+            import aiosqlite
+        except ImportError:
+            return await asyncio.to_thread(self.get, key)
+
+        async with aiosqlite.connect(self.path) as db:
+            async with db.execute(
+                "SELECT response FROM responses WHERE hash = ? AND expires_at > ?",
+                (key, int(time.time())),
+            ) as cursor:
+                row = await cursor.fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    async def aset(self, key: str, response: Any, prompt_version: str = "") -> None:
+        """Async version of set() that does not block the event loop."""
+        try:
+            import aiosqlite
+        except ImportError:
+            return await asyncio.to_thread(self.set, key, response, prompt_version)
+
+        now = int(time.time())
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute(
+                "INSERT OR REPLACE INTO responses (hash, response, prompt_version, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(response), prompt_version, now, now + self.ttl_seconds),
+            )
+            await db.commit()
+
+
+class CachedAgent:
+    """Wraps a LangChain agent so identical questions are served from an LLMCache."""
+
+    def __init__(self, agent: Any, cache: LLMCache, model_name: str, prefix: str,
+                 tools: List[Any], temperature: float = 0, prompt_version: str = ""):
+        self.agent = agent
+        self.cache = cache
+        self.model_name = model_name
+        self.prefix = prefix
+        self.tool_names = [tool.name for tool in tools]
+        self.temperature = temperature
+        self.prompt_version = prompt_version
+
+    def _key(self, input: Dict[str, Any]) -> Optional[str]:
+        """Build the cache key for an agent input."""
+        return self.cache.cache_key(
+            self.model_name,
+            [self.prefix, input["input"]],
+            self.temperature,
+            self.tool_names,
+            self.prompt_version,
+        )
+
+    def invoke(self, input: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer from the cache if possible, otherwise call the agent and store the result."""
+        key = self._key(input)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        result = self.agent.invoke(input)
+
+        if key is not None:
+            self.cache.set(key, result, self.prompt_version)
+        return result
+
+    async def ainvoke(self, input: Dict[str, Any]) -> Dict[str, Any]:
+        """Async version of invoke()."""
+        key = self._key(input)
+        if key is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached
+
+        result = await self.agent.ainvoke(input)
+
+        if key is not None:
+            await self.cache.aset(key, result, self.prompt_version)
+        return result
@@ -0,0 +1,10 @@
+# conftest.py
+# Shared pytest fixtures for the test suite.
+
+import pytest
+from tas_data import get_db
+
+@pytest.fixture(scope="session")
+def db():
+    """The fruit fly database, loaded once and shared by every test in the session."""
+    return get_db()
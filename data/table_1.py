@@ -1,88 +1,44 @@
 # Table 1: Pest and Disease Name Key for Tables 2-4
 
-pest_info = {
-    "BW": {
-        "name": "Bacterial Wilt",
-        "present_in": []
-    },
-    "CB": {
-        "name": "Chickpea Blight",
-        "present_in": []
-    },
-    "DW": {
-        "name": "Declared Weeds",
-        "present_in": ["QLD", "NSW", "VIC", "WA", "NT", "SA"]
-    },
-    "EHB": {
-        "name": "European House Borer",
-        "present_in": ["WA"]
-    },
-    "FB": {
-        "name": "Fire Blight",
-        "present_in": []
-    },
-    "GMP": {
-        "name": "Genetically Modified Plants",
-        "present_in": ["QLD", "NSW", "VIC", "WA", "NT", "SA"]
-    },
-    "GP": {
-        "name": "Grape Phylloxera",
-        "present_in": ["NSW", "VIC"]
-    },
-    "IYSV": {
-        "name": "Iris Yellow Spot Virus",
-        "present_in": []
-    },
-    "LA": {
-        "name": "Lupin Anthracnose",
-        "present_in": ["WA", "SA"]
-    },
-    "MFF": {
-        "name": "Mediterranean Fruit Fly",
-        "present_in": ["WA"]
-    },
-    "MR": {
-        "name": "Myrtle Rust",
-        "present_in": ["QLD", "NSW", "VIC"]
-    },
-    "NS": {
-        "name": "Nursery Stock",
-        "present_in": []
-    },
-    "OS": {
-        "name": "Onion Smut",
-        "present_in": ["SA"]
-    },
-    "PCN": {
-        "name": "Potato Cyst Nematode",
-        "present_in": ["VIC"]
-    },
-    "PW": {
-        "name": "Pea Weevil",
-        "present_in": []
-    },
-    "QFF": {
-        "name": "Queensland Fruit Fly",
-        "present_in": ["QLD", "NSW", "VIC", "NT"]
-    },
-    "RIFA": {
-        "name": "Red Imported Fire Ant",
-        "present_in": ["QLD", "NSW"]
-    },
-    "RN": {
-        "name": "Ryegrass Nematode",
-        "present_in": []
-    },
-    "SLW": {
-        "name": "Silverleaf Whitefly",
-        "present_in": ["QLD"]
-    },
-    "TPP": {
-        "name": "Tomato Potato Psyllid",
-        "present_in": ["WA"]
-    },
-    "TYLCV": {
-        "name": "Tomato Yellow Leaf Curl Virus",
-        "present_in": ["QLD", "NT"]
-    }
+import sys
+from typing import Dict, FrozenSet
+
+
+class PestInfo:
+    """A pest or disease from Table 1 and the states it is present in."""
+    __slots__ = ("name", "present_in")
+
+    def __init__(self, name: str, present_in: FrozenSet[str]):
+        self.name = name
+        self.present_in = present_in
+
+    def __repr__(self) -> str:
+        return f"PestInfo(name={self.name!r}, present_in={self.present_in!r})"
+
+
+# Interned state codes shared by every entry
+QLD, NSW, VIC, WA, NT, SA = (sys.intern(s) for s in ("QLD", "NSW", "VIC", "WA", "NT", "SA"))
+
+pest_info: Dict[str, PestInfo] = {
+    "BW": PestInfo("Bacterial Wilt", frozenset()),
+    "CB": PestInfo("Chickpea Blight", frozenset()),
+    "DW": PestInfo("Declared Weeds", frozenset([QLD, NSW, VIC, WA, NT, SA])),
+    "EHB": PestInfo("European House Borer", frozenset([WA])),
+    "FB": PestInfo("Fire Blight", frozenset()),
+    "GMP": PestInfo("Genetically Modified Plants", frozenset([QLD, NSW, VIC, WA, NT, SA])),
+    "GP": PestInfo("Grape Phylloxera", frozenset([NSW, VIC])),
+    "IYSV": PestInfo("Iris Yellow Spot Virus", frozenset()),
+    "LA": PestInfo("Lupin Anthracnose", frozenset([WA, SA])),
+    "MFF": PestInfo("Mediterranean Fruit Fly", frozenset([WA])),
+    "MR": PestInfo("Myrtle Rust", frozenset([QLD, NSW, VIC])),
+    "NS": PestInfo("Nursery Stock", frozenset()),
+    "OS": PestInfo("Onion Smut", frozenset([SA])),
+    "PCN": PestInfo("Potato Cyst Nematode", frozenset([VIC])),
+    "PW": PestInfo("Pea Weevil", frozenset()),
+    "QFF": PestInfo("Queensland Fruit Fly", frozenset([QLD, NSW, VIC, NT])),
+    "RIFA": PestInfo("Red Imported Fire Ant", frozenset([QLD, NSW])),
+    "RN": PestInfo("Ryegrass Nematode", frozenset()),
+    "SLW": PestInfo("Silverleaf Whitefly", frozenset([QLD])),
+    "TPP": PestInfo("Tomato Potato Psyllid", frozenset([WA])),
+    "TYLCV": PestInfo("Tomato Yellow Leaf Curl Virus", frozenset([QLD, NT]))
 }
@@ -0,0 +1,84 @@
+# prompt_compression.py
+# This file provides optional LLMLingua compression of the static agent prefix.
+# The prefix is sent with every LLM call, so shrinking it reduces input tokens and
+# time-to-first-token on every query. Compression results are cached on disk keyed by
+# a hash of the raw prefix, so the (slow) compression model only runs when the prefix
+# changes. Requires the optional `llmlingua` package.
+
+import hashlib
+import json
+import os
+import tempfile
+import warnings
+from typing import Dict
+
+# Location of the on-disk cache of compressed prefixes
+COMPRESSION_CACHE_PATH = "tas_prompt_cache.json"
+
+# LLMLingua-2 model used to classify which tokens to keep
+# (force_tokens is only honoured by LLMLingua-2 models, not the Llama-2 perplexity compressor)
+COMPRESSION_MODEL = "microsoft/llmlingua-2-xlm-roberta-large-meetingbank"
+
+# Target fraction of tokens kept after compression
+COMPRESSION_RATE = 0.4
+
+# Domain anchors that must survive compression (pest acronyms, state codes, tool names, etc.)
+FORCE_TOKENS = [
+    "QFF", "MFF", "ICA", "Tasmania", "QLD", "NSW", "VIC", "WA", "NT", "SA", "TAS", "ACT",
+    "fruit_fly_assessment", "fruit_fly_answer"
+]
+
+
+def _load_cache() -> Dict[str, str]:
+    """Load previously compressed prefixes from disk."""
+    if not os.path.exists(COMPRESSION_CACHE_PATH):
+        return {}
+    with open(COMPRESSION_CACHE_PATH, "r") as f:
+        return json.load(f)
+
+
+def _save_cache(cache: Dict[str, str]):
+    """
+    Save compressed prefixes to disk.
+    Written to a temporary file and moved into place, so an interrupted write never
+    leaves a truncated cache behind.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(COMPRESSION_CACHE_PATH) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, COMPRESSION_CACHE_PATH)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def compress_prefix(prefix: str) -> str:
+    """
+    Return a compressed version of the prefix.
+    Falls back to the original prefix if llmlingua is not installed.
+    """
+    key = hashlib.sha256(
+        f"{COMPRESSION_MODEL}|{COMPRESSION_RATE}|{','.join(FORCE_TOKENS)}|{prefix}".encode("utf-8")
+    ).hexdigest()
+
+    cache = _load_cache()
+    if key in cache:
+        return cache[key]
+
+    try:
+        from llmlingua import PromptCompressor
+    except ImportError:
+        warnings.warn("llmlingua is not installed - using the uncompressed prefix", RuntimeWarning)
+        return prefix
+
+    compressor = PromptCompressor(model_name=COMPRESSION_MODEL, use_llmlingua2=True)
+    compressed = compressor.compress_prompt(
+        prefix,
+        rate=COMPRESSION_RATE,
+        force_tokens=FORCE_TOKENS
+    )["compressed_prompt"]
+
+    cache[key] = compressed
+    _save_cache(cache)
+    return compressed
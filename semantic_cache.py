@@ -0,0 +1,172 @@
+# semantic_cache.py
+# This file provides an opt-in semantic cache for the LangChain agent.
+# Unlike the exact-match cache in cache.py, it also reuses answers for paraphrased
+# questions (e.g. "bring strawberries from QLD" vs "import strawberry fruit from
+# Queensland") by comparing sentence embeddings with cosine similarity.
+# Requires the optional `sentence-transformers` package.
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional
+
+import numpy as np
+
+# Small, fast sentence embedding model (384 dimensions)
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
+
+# Minimum cosine similarity for two questions to be considered equivalent
+DEFAULT_THRESHOLD = 0.92
+
+# Cached answers expire after 7 days (same as the exact-match cache)
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Maximum number of answers kept per cache before the least recently used is evicted
+DEFAULT_MAX_ENTRIES = 1000
+
+
+@lru_cache(maxsize=None)
+def get_encoder(model_name: str = EMBEDDING_MODEL):
+    """Load the sentence embedding model once per process."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+class SemanticCache:
+    """In-memory cache that matches questions by embedding similarity."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD,
+                 ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 model_name: str = EMBEDDING_MODEL):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.model_name = model_name
+
+        # Each slot holds one normalized question embedding and its answer
+        self._embeddings = np.zeros((max_entries, EMBEDDING_DIM), dtype=np.float32)
+        self._expires_at = np.zeros(max_entries, dtype=np.float64)
+        self._responses: List[Optional[Any]] = [None] * max_entries
+        # Scope each answer was stored under (e.g. the states and commodities it is about)
+        self._scopes: List[Optional[Hashable]] = [None] * max_entries
+
+        # Slot indices in least -> most recently used order
+        self._lru: Deque[int] = deque()
+
+        # Guards the slots when async callers use the cache from worker threads;
+        # encoding happens outside the lock
+        self._lock = threading.Lock()
+
+    def _encode(self, query: str) -> np.ndarray:
+        """Encode a question as a normalized embedding vector."""
+        return get_encoder(self.model_name).encode(
+            query, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32)
+
+    def _touch(self, slot: int) -> None:
+        """Mark a slot as most recently used."""
+        self._lru.remove(slot)
+        self._lru.append(slot)
+
+    def get(self, query: str, scope: Optional[Hashable] = None) -> Optional[Any]:
+        """
+        Return the answer to the most similar cached question, if similar enough.
+        Only answers stored under the same scope are considered.
+        """
+        if not self._lru:
+            return None
+
+        embedding = self._encode(query)
+        with self._lock:
+            scores = self._embeddings @ embedding
+
+            # Ignore empty and expired slots, and answers about something else
+            # ("apples from NSW" and "apples from WA" embed almost identically)
+            scores[self._expires_at <= time.time()] = -1.0
+            scores[[s != scope for s in self._scopes]] = -1.0
+
+            slot = int(np.argmax(scores))
+            if scores[slot] < self.threshold:
+                return None
+
+            self._touch(slot)
+            return self._responses[slot]
+
+    def set(self, query: str, response: Any, scope: Optional[Hashable] = None) -> None:
+        """Store the answer to a question, evicting the least recently used entry if full."""
+        embedding = self._encode(query)
+        with self._lock:
+            if len(self._lru) < self.max_entries:
+                slot = len(self._lru)
+            else:
+                slot = self._lru.popleft()
+
+            self._embeddings[slot] = embedding
+            self._expires_at[slot] = time.time() + self.ttl_seconds
+            self._responses[slot] = response
+            self._scopes[slot] = scope
+            self._lru.append(slot)
+
+
+# One cache per (model, tool set, prompt version) scope so different agents never
+# share answers
+_caches: Dict[str, SemanticCache] = {}
+
+
+def get_semantic_cache(model_name: str, tool_names: List[str], prompt_version: str = "",
+                       **kwargs: Any) -> SemanticCache:
+    """Return the semantic cache for an agent configuration, creating it if needed."""
+    scope = hashlib.sha256(
+        "|".join([model_name, ",".join(sorted(tool_names)), prompt_version]).encode("utf-8")
+    ).hexdigest()
+    if scope not in _caches:
+        _caches[scope] = SemanticCache(**kwargs)
+    return _caches[scope]
+
+
+class SemanticCachedAgent:
+    """
+    Wraps a LangChain agent so semantically equivalent questions reuse a prior answer.
+    scope_fn maps a question to what its answer depends on (e.g. the origin states and
+    commodities it names); a cached answer is only reused for a question with the same scope.
+    """
+
+    def __init__(self, agent: Any, cache: SemanticCache,
+                 scope_fn: Optional[Callable[[str], Hashable]] = None):
+        self.agent = agent
+        self.cache = cache
+        self.scope_fn = scope_fn
+
+    def _scope(self, query: str) -> Optional[Hashable]:
+        return self.scope_fn(query) if self.scope_fn else None
+
+    def invoke(self, input: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer from the semantic cache if possible, otherwise call the agent."""
+        scope = self._scope(input["input"])
+        cached = self.cache.get(input["input"], scope)
+        if cached is not None:
+            return {**cached, "input": input["input"]}
+
+        result = self.agent.invoke(input)
+        self.cache.set(input["input"], result, scope)
+        return result
+
+    async def ainvoke(self, input: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async version of invoke().
+        Embedding is synchronous, so cache access runs in a worker thread to keep the
+        event loop free for other questions.
+        """
+        scope = self._scope(input["input"])
+        cached = await asyncio.to_thread(self.cache.get, input["input"], scope)
+        if cached is not None:
+            return {**cached, "input": input["input"]}
+
+        result = await self.agent.ainvoke(input)
+        await asyncio.to_thread(self.cache.set, input["input"], result, scope)
+        return result
@@ -0,0 +1,15 @@
+# tas_constants.py
+# This file holds static text shared across the agent modules.
+# Keeping a single copy means every response (and every prompt that mentions it)
+# uses byte-identical text.
+
+from typing import Final
+
+# Generic footer that must be appended to all responses
+# This ensures users are always reminded of the baseline requirements
+GENERIC_TAS_FOOTER: Final[str] = (
+    "⚠️  **Pre-entry paperwork (PBM-Tas §2.2)**\n"
+    "• Lodge a *Notice of Intention (NoI) to Import* with Biosecurity Tasmania at least **24 h before the consignment arrives**; and\n"
+    "• If required, attach an acceptable Plant Health Certificate, PHAC or equivalent phytosanitary certificate.\n\n"
+    "Commodity-specific conditions (see above) apply on top of these baseline rules."
+)
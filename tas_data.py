@@ -5,22 +5,78 @@
 # - Pest presence by state
 # - ICA conditions for fruit fly hosts
 
-from typing import Dict, List, Optional, Set
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
 from dataclasses import dataclass
+import hashlib
 import json
-from pathlib import Path
+import os
+import pickle
+import re
+import sys
+import tempfile
+from bisect import bisect_left
+from functools import lru_cache
 
-@dataclass
+# Optional: Hyperscan compiles all commodity names into one automaton for matching in free text
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Optional: orjson parses pests.json straight from bytes, faster than the stdlib json module
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Source pest data and the prebuilt snapshot generated from it by build_snapshot.py
+PESTS_PATH = "data/pests.json"
+SNAPSHOT_PATH = "data/pests.pkl"
+
+# Pest records in pests.json that the database loads
+FRUIT_FLY_ACRONYMS = frozenset(["QFF", "MFF"])
+
+# Host lists for a state with no fruit flies present
+_NO_HOSTS: Dict[str, Tuple[str, ...]] = {"QFF": (), "MFF": ()}
+
+# Bump whenever the snapshot contents or the classes stored in it change
+SNAPSHOT_VERSION = 6
+
+# Minimum cosine similarity for fuzzy_match_commodity to accept a host name
+FUZZY_MATCH_THRESHOLD = 0.6
+
+@dataclass(frozen=True, slots=True)
 class FruitFlyInfo:
     """Information about a fruit fly species."""
     common_name: str
     acronym: str
     scientific_name: str
-    hosts: List[str]
+    hosts: Tuple[str, ...]
     states_present: List[Dict[str, str]]
-    states_absent: List[str]
+    states_absent: Tuple[str, ...]
+    # State codes derived from the lists above for O(1) membership checks
+    states_present_set: FrozenSet[str] = frozenset()
+    states_absent_set: FrozenSet[str] = frozenset()
+    
+    @classmethod
+    def from_record(cls, pest: Dict[str, Any]) -> "FruitFlyInfo":
+        """Build a FruitFlyInfo from a pest record in pests.json."""
+        # Pest and state codes recur across records, so intern them to share one string each
+        states_present = pest["states_present"]
+        states_absent = tuple(sys.intern(s) for s in pest["states_absent"])
+        return cls(
+            common_name=pest["pest_common_name"],
+            acronym=sys.intern(pest["pest_acronym"]),
+            scientific_name=pest["scientific_name"],
+            hosts=tuple(pest["hosts"]),
+            states_present=states_present,
+            states_absent=states_absent,
+            states_present_set=frozenset(sys.intern(s["state_code"]) for s in states_present),
+            states_absent_set=frozenset(states_absent)
+        )
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CommodityInfo:
     """Structured information about a commodity's fruit fly host status."""
     name: str
@@ -28,129 +84,411 @@ class CommodityInfo:
     mff_host: bool = False
     is_fruit_fly_host: bool = False
 
+@dataclass(frozen=True, slots=True)
+class RiskAssessment:
+    """Fruit fly risk for a commodity from an origin state; error is set if the commodity is unknown."""
+    commodity: str
+    origin_state: str
+    is_fruit_fly_host: bool = False
+    qff_risk: bool = False
+    mff_risk: bool = False
+    risk_details: Tuple[str, ...] = ()
+    error: Optional[str] = None
+
+def _source_key(path: str = PESTS_PATH) -> str:
+    """Hash of the source file's path, mtime and size, used to tag snapshots built from it."""
+    st = os.stat(path)
+    return hashlib.sha256(repr((os.path.abspath(path), st.st_mtime_ns, st.st_size)).encode("utf-8")).hexdigest()
+
+def _plural_forms(name: str) -> List[str]:
+    """Regular English plurals of a lowercase commodity name (e.g. "strawberry" -> "strawberries")."""
+    if name.endswith("y") and name[-2:-1] not in "aeiou":
+        return [name[:-1] + "ies"]
+    if name.endswith(("s", "x", "ch", "sh", "o")):
+        return [name + "es", name + "s"]
+    return [name + "s"]
+
+def _commodity_pattern(name: str) -> str:
+    """Regex matching a lowercase commodity name, or its regular plural, as whole words."""
+    if name.endswith("y") and name[-2:-1] not in "aeiou":
+        body = re.escape(name[:-1]) + "(?:y|ies)"
+    else:
+        body = re.escape(name) + "(?:e?s)?"
+    return r"\b" + body + r"\b"
+
 class FruitFlyDatabase:
     """Main database class that manages fruit fly data from pests.json."""
     
-    def __init__(self):
-        """Initialize the database and load fruit fly data."""
+    def __init__(self, use_snapshot: bool = True):
+        """
+        Initialize the database and load fruit fly data.
+        A prebuilt snapshot is used when it was built from the current pests.json,
+        otherwise the data is parsed and indexed from the JSON file and the
+        snapshot is refreshed.
+        """
         self.fruit_flies: Dict[str, FruitFlyInfo] = {}
         self.commodities: Dict[str, CommodityInfo] = {}
+        
+        # Interned lowercase key -> original host name, and alias -> key
+        # (aliases cover regular plurals so trivial variants never reach the LLM)
+        self._norm_keys: Dict[str, str] = {}
+        self.aliases: Dict[str, str] = {}
+        
+        # Search indexes built alongside the commodity index
+        self._trigram_index: Dict[str, Set[str]] = {}
+        self._sorted_keys: List[str] = []
+        
+        # (pest acronym, state) pairs where the pest is present, for single-lookup checks
+        self._state_presence: FrozenSet[Tuple[str, str]] = frozenset()
+        
+        # Fruit fly hosts relevant to each state, precomputed from the pest data
+        self._hosts_by_state: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+        
+        # Matcher for commodity names in free text, compiled on first use
+        self._text_matcher = None
+        self._text_keys: List[str] = []
+        
+        # Host name embeddings for fuzzy matching, batch-encoded on first use
+        # (requires the optional sentence-transformers package)
+        self._host_names: List[CommodityInfo] = []
+        self._host_embeddings = None
+        
+        # Per-instance memo of risk assessments, so the cache never outlives the database
+        self._cached_assessment = lru_cache(maxsize=2048)(self._assess_fruit_fly_risk)
+        
+        if use_snapshot and self._load_snapshot():
+            return
+        
         self._load_pest_data()
         self._build_commodity_index()
+        
+        if use_snapshot:
+            try:
+                self.save_snapshot()
+            except OSError:
+                pass
+    
+    def _snapshot_state(self) -> Dict[str, Any]:
+        """Return the internal state stored in a snapshot."""
+        return {
+            "version": SNAPSHOT_VERSION,
+            "source_key": _source_key(),
+            "fruit_flies": self.fruit_flies,
+            "commodities": self.commodities,
+            "norm_keys": self._norm_keys,
+            "aliases": self.aliases,
+            "state_presence": self._state_presence,
+            "hosts_by_state": self._hosts_by_state,
+            "trigram_index": self._trigram_index,
+            "sorted_keys": self._sorted_keys
+        }
+    
+    def save_snapshot(self, path: str = SNAPSHOT_PATH):
+        """
+        Save the loaded and indexed data to a pickle snapshot.
+        The snapshot is written to a temporary file and moved into place, so a crash or a
+        concurrent writer never leaves a truncated snapshot behind.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(self._snapshot_state(), f, protocol=5)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    def _load_snapshot(self, path: str = SNAPSHOT_PATH) -> bool:
+        """
+        Load the database from a snapshot if it was built from the current pests.json.
+        Returns False if the snapshot is missing, stale or unreadable.
+        """
+        try:
+            # The snapshot is a local build artifact produced by build_snapshot.py
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+            
+            if state.get("version") != SNAPSHOT_VERSION or state.get("source_key") != _source_key():
+                return False
+            
+            self.fruit_flies = state["fruit_flies"]
+            self.commodities = state["commodities"]
+            self._norm_keys = state["norm_keys"]
+            self.aliases = state["aliases"]
+            self._state_presence = state["state_presence"]
+            self._hosts_by_state = state["hosts_by_state"]
+            self._trigram_index = state["trigram_index"]
+            self._sorted_keys = state["sorted_keys"]
+            return True
+        except Exception:
+            return False
     
     def _load_pest_data(self):
         """Load fruit fly data from pests.json."""
         try:
-            with open("data/pests.json", "r") as f:
-                data = json.load(f)
+            with open(PESTS_PATH, "rb") as f:
+                data = _json_loads(f.read())
             
             for pest in data["pests"]:
                 # Only process fruit flies
-                if pest["pest_acronym"] in ["QFF", "MFF"]:
-                    self.fruit_flies[pest["pest_acronym"]] = FruitFlyInfo(
-                        common_name=pest["pest_common_name"],
-                        acronym=pest["pest_acronym"],
-                        scientific_name=pest["scientific_name"],
-                        hosts=pest["hosts"],
-                        states_present=pest["states_present"],
-                        states_absent=pest["states_absent"]
-                    )
+                if pest["pest_acronym"] in FRUIT_FLY_ACRONYMS:
+                    fruit_fly = FruitFlyInfo.from_record(pest)
+                    self.fruit_flies[fruit_fly.acronym] = fruit_fly
         except Exception as e:
             print(f"Error loading pest data: {e}")
     
     def _build_commodity_index(self):
         """Build an index of all commodities and their fruit fly host status."""
-        # Get all unique hosts from both fruit flies
-        all_hosts = set()
-        for fruit_fly in self.fruit_flies.values():
-            all_hosts.update(fruit_fly.hosts)
+        # Host sets for each fruit fly, built once for O(1) membership checks
+        qff = self.fruit_flies.get("QFF")
+        mff = self.fruit_flies.get("MFF")
+        qff_hosts = frozenset(qff.hosts) if qff else frozenset()
+        mff_hosts = frozenset(mff.hosts) if mff else frozenset()
         
-        # Create commodity entries
-        for host in all_hosts:
-            qff_host = host in self.fruit_flies.get("QFF", FruitFlyInfo("", "", "", [], [], [])).hosts
-            mff_host = host in self.fruit_flies.get("MFF", FruitFlyInfo("", "", "", [], [], [])).hosts
+        # Create commodity entries, normalizing each host name once
+        for host in qff_hosts | mff_hosts:
+            qff_host = host in qff_hosts
+            mff_host = host in mff_hosts
             
-            self.commodities[host.lower()] = CommodityInfo(
+            key = sys.intern(host.lower())
+            self._norm_keys[key] = host
+            self.commodities[key] = CommodityInfo(
                 name=host,
                 qff_host=qff_host,
                 mff_host=mff_host,
                 is_fruit_fly_host=qff_host or mff_host
             )
+        
+        # Plural aliases, never shadowing a real commodity name
+        for key in self.commodities:
+            for alias in _plural_forms(key):
+                if alias not in self.commodities:
+                    self.aliases[sys.intern(alias)] = key
+        
+        self._build_search_index()
+        self._build_state_host_index()
+    
+    def _build_state_host_index(self):
+        """Precompute pest presence and the fruit fly hosts relevant to every state named in the pest data."""
+        self._state_presence = frozenset(
+            (fruit_fly.acronym, state)
+            for fruit_fly in self.fruit_flies.values()
+            for state in fruit_fly.states_present_set
+        )
+        
+        all_states = set()
+        for fruit_fly in self.fruit_flies.values():
+            all_states.update(fruit_fly.states_present_set)
+            all_states.update(fruit_fly.states_absent_set)
+        
+        # Sorted tuples: compact, and safe to share between states and callers
+        qff_hosts = tuple(sorted(c.name for c in self.commodities.values() if c.qff_host))
+        mff_hosts = tuple(sorted(c.name for c in self.commodities.values() if c.mff_host))
+        
+        self._hosts_by_state = {
+            state: {
+                "QFF": qff_hosts if self.is_pest_present_in_state("QFF", state) else (),
+                "MFF": mff_hosts if self.is_pest_present_in_state("MFF", state) else ()
+            }
+            for state in all_states
+        }
+    
+    def _build_search_index(self):
+        """
+        Build the indexes used by search_commodities:
+        - a trigram index mapping every 3-character substring to the commodity keys containing it
+        - a sorted list of keys for prefix lookups on queries shorter than 3 characters
+        """
+        self._trigram_index = {}
+        for key in self.commodities:
+            for i in range(len(key) - 2):
+                self._trigram_index.setdefault(key[i:i + 3], set()).add(key)
+        
+        self._sorted_keys = sorted(self.commodities)
     
     def get_fruit_fly_info(self, acronym: str) -> Optional[FruitFlyInfo]:
         """Get information about a specific fruit fly."""
         return self.fruit_flies.get(acronym)
     
     def is_pest_present_in_state(self, pest_acronym: str, state: str) -> bool:
-        """Check if a pest is present in a specific state."""
-        pest = self.fruit_flies.get(pest_acronym)
-        if not pest:
-            return False
-        
-        # Check states_present
-        for state_info in pest.states_present:
-            if state_info["state_code"] == state:
-                return True
-        
-        # Check states_absent
-        return state not in pest.states_absent
+        """
+        Check if a pest is present in a specific state.
+        A pest only counts as present if the state is explicitly listed in states_present.
+        """
+        return (pest_acronym, state) in self._state_presence
     
     def get_commodity_info(self, commodity_name: str) -> Optional[CommodityInfo]:
-        """Get information about a commodity."""
-        return self.commodities.get(commodity_name.lower())
+        """Get information about a commodity by name or plural alias."""
+        key = commodity_name.lower().strip()
+        # Aliases never shadow a commodity name, so resolving the alias first is safe
+        return self.commodities.get(self.aliases.get(key, key))
     
     def search_commodities(self, query: str) -> List[CommodityInfo]:
         """Search for commodities containing the query string."""
         query = query.lower().strip()
+        
+        # Short queries have no trigrams, so fall back to a prefix match
+        if len(query) < 3:
+            start = bisect_left(self._sorted_keys, query)
+            matches = []
+            for key in self._sorted_keys[start:]:
+                if not key.startswith(query):
+                    break
+                matches.append(self.commodities[key])
+            return matches
+        
+        # Only keys containing every trigram of the query can contain the query, so
+        # the rarest trigram's keys are a complete shortlist for the substring check
+        candidates: Optional[Set[str]] = None
+        for i in range(len(query) - 2):
+            keys = self._trigram_index.get(query[i:i + 3])
+            if not keys:
+                return []
+            if candidates is None or len(keys) < len(candidates):
+                candidates = keys
+        
         return [
-            info for name, info in self.commodities.items()
-            if query in name
+            self.commodities[key] for key in sorted(candidates)
+            if query in key
         ]
     
-    def get_fruit_fly_hosts_for_state(self, state: str) -> Dict[str, List[str]]:
-        """Get all fruit fly hosts that are relevant for a specific state."""
-        result = {"QFF": [], "MFF": []}
+    def _build_text_matcher(self):
+        """
+        Compile every commodity name into a single matcher for find_commodities_in_text.
+        Uses a Hyperscan database when available, otherwise one alternation regex.
+        """
+        # Longest names first so the regex fallback prefers "custard apple" over "apple"
+        self._text_keys = sorted(self.commodities, key=len, reverse=True)
+        patterns = [_commodity_pattern(key) for key in self._text_keys]
+        
+        if hyperscan is not None:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[p.encode() for p in patterns],
+                ids=list(range(len(patterns))),
+                elements=len(patterns),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(patterns)
+            )
+            self._text_matcher = db
+        else:
+            self._text_matcher = re.compile(
+                "|".join(f"(?P<c{i}>{p})" for i, p in enumerate(patterns)), re.IGNORECASE
+            )
+    
+    def find_commodities_in_text(self, text: str) -> List[CommodityInfo]:
+        """
+        Find the commodities named in a piece of free text, in order of appearance.
+        Where names overlap (e.g. "custard apple" and "apple") only the longest is kept.
+        """
+        if self._text_matcher is None:
+            self._build_text_matcher()
         
-        for commodity_name, commodity_info in self.commodities.items():
-            if commodity_info.qff_host and self.is_pest_present_in_state("QFF", state):
-                result["QFF"].append(commodity_info.name)
-            if commodity_info.mff_host and self.is_pest_present_in_state("MFF", state):
-                result["MFF"].append(commodity_info.name)
+        # Collect (start, end, key index) spans for every match
+        spans = []
+        if hyperscan is not None:
+            def on_match(idx, start, end, flags, context):
+                spans.append((start, end, idx))
+            self._text_matcher.scan(text.encode("utf-8"), match_event_handler=on_match)
+        else:
+            for m in self._text_matcher.finditer(text):
+                spans.append((m.start(), m.end(), int(m.lastgroup[1:])))
         
-        return result
+        # Keep the longest match at each position and drop matches inside it
+        matches = []
+        last_end = -1
+        for start, end, idx in sorted(spans, key=lambda span: (span[0], span[0] - span[1])):
+            if start >= last_end:
+                matches.append(self.commodities[self._text_keys[idx]])
+                last_end = end
+        return matches
     
-    def assess_fruit_fly_risk(self, commodity_name: str, origin_state: str) -> Dict[str, any]:
-        """Assess fruit fly risk for a commodity from a specific state."""
+    def _build_host_embeddings(self):
+        """Encode every commodity name in one batch as a normalized float16 matrix."""
+        import numpy as np
+        from semantic_cache import get_encoder
+        
+        self._host_names = list(self.commodities.values())
+        self._host_embeddings = get_encoder().encode(
+            [c.name for c in self._host_names],
+            batch_size=64, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float16)
+    
+    def fuzzy_match_commodity(self, query: str, top_k: int = 3) -> List[CommodityInfo]:
+        """
+        Find the commodities whose names are closest in meaning or spelling to the query
+        (e.g. a misspelling like "strawbery"), best match first.
+        Only suitable as "did you mean" suggestions: a close name is not the same commodity.
+        Returns an empty list when sentence-transformers is not installed.
+        """
+        try:
+            if self._host_embeddings is None:
+                self._build_host_embeddings()
+        except ImportError:
+            return []
+        
+        import numpy as np
+        from semantic_cache import get_encoder
+        
+        q = get_encoder().encode(query, normalize_embeddings=True, convert_to_numpy=True)
+        scores = self._host_embeddings @ q.astype(np.float16)
+        best = np.argsort(scores)[::-1][:top_k]
+        return [self._host_names[i] for i in best if scores[i] >= FUZZY_MATCH_THRESHOLD]
+    
+    def get_fruit_fly_hosts_for_state(self, state: str) -> Dict[str, Tuple[str, ...]]:
+        """
+        Get all fruit fly hosts that are relevant for a specific state.
+        Returns a new dict each call, so callers cannot change the shared index.
+        """
+        return dict(self._hosts_by_state.get(state, _NO_HOSTS))
+    
+    def assess_fruit_fly_risk(self, commodity_name: str, origin_state: str) -> "RiskAssessment":
+        """
+        Assess fruit fly risk for a commodity from a specific state.
+        Results are cached per normalized (commodity, state) pair and are immutable.
+        """
+        return self._cached_assessment(commodity_name.lower().strip(), origin_state.upper().strip())
+    
+    def _assess_fruit_fly_risk(self, commodity_name: str, origin_state: str) -> "RiskAssessment":
+        """Uncached risk assessment for an already normalized commodity name and state."""
         commodity = self.get_commodity_info(commodity_name)
         if not commodity:
-            return {"error": f"Commodity '{commodity_name}' not found"}
-        
-        risk_assessment = {
-            "commodity": commodity.name,
-            "origin_state": origin_state,
-            "is_fruit_fly_host": commodity.is_fruit_fly_host,
-            "qff_risk": False,
-            "mff_risk": False,
-            "risk_details": []
-        }
+            return RiskAssessment(commodity_name, origin_state, error=f"Commodity '{commodity_name}' not found")
         
-        if commodity.qff_host:
-            qff_present = self.is_pest_present_in_state("QFF", origin_state)
-            risk_assessment["qff_risk"] = qff_present
-            if qff_present:
-                risk_assessment["risk_details"].append(
-                    f"{commodity.name} is a Queensland Fruit Fly host and QFF is present in {origin_state}"
-                )
-        
-        if commodity.mff_host:
-            mff_present = self.is_pest_present_in_state("MFF", origin_state)
-            risk_assessment["mff_risk"] = mff_present
-            if mff_present:
-                risk_assessment["risk_details"].append(
-                    f"{commodity.name} is a Mediterranean Fruit Fly host and MFF is present in {origin_state}"
-                )
-        
-        return risk_assessment
-
-# Create singleton instance for use throughout the application
-fruit_fly_db = FruitFlyDatabase() 
\ No newline at end of file
+        risk_details = []
+        
+        qff_risk = commodity.qff_host and self.is_pest_present_in_state("QFF", origin_state)
+        if qff_risk:
+            risk_details.append(
+                f"{commodity.name} is a Queensland Fruit Fly host and QFF is present in {origin_state}"
+            )
+        
+        mff_risk = commodity.mff_host and self.is_pest_present_in_state("MFF", origin_state)
+        if mff_risk:
+            risk_details.append(
+                f"{commodity.name} is a Mediterranean Fruit Fly host and MFF is present in {origin_state}"
+            )
+        
+        return RiskAssessment(
+            commodity=commodity.name,
+            origin_state=origin_state,
+            is_fruit_fly_host=commodity.is_fruit_fly_host,
+            qff_risk=qff_risk,
+            mff_risk=mff_risk,
+            risk_details=tuple(risk_details)
+        )
+
+# Shared database instance, created on first use so importing this module stays cheap
+_db: Optional[FruitFlyDatabase] = None
+
+def get_db() -> FruitFlyDatabase:
+    """Return the shared fruit fly database, loading it on first use."""
+    global _db
+    if _db is None:
+        _db = FruitFlyDatabase()
+    return _db
+
+def __getattr__(name: str) -> Any:
+    """Keep `tas_data.fruit_fly_db` working without loading the database at import time."""
+    if name == "fruit_fly_db":
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,14 +3,16 @@
 # It uses OpenAI embeddings to convert text into vectors that can be semantically searched
 # Note: We use OpenAI embeddings because Gemini doesn't provide embedding capabilities
 
+import asyncio
 import os
+from bisect import bisect_left, bisect_right
+from typing import Any, List, Optional
 from dotenv import load_dotenv
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 import re
-from langchain_core.documents import Document
 
 # Load environment variables (including OPENAI_API_KEY for embeddings)
 load_dotenv()
@@ -18,7 +20,84 @@ load_dotenv()
 # Path to the local PDF file
 PDF_PATH = "pdfs/tas_pqm.pdf"
 
-try:
+# Source label stored in every chunk's metadata
+SOURCE_NAME = "Tasmanian PQM 2024"
+
+# Section headings such as "Section 2.3.1", recorded in chunk metadata
+_SECTION_RE = re.compile(r"Section\s+(\d+[\.\d]*)")
+
+# Sentence ends and paragraph breaks where fast_split may end a chunk
+_BREAK_RE = re.compile(r"[.!?]\s+|\n\n+")
+
+# Set TAS_FAST_SPLIT=1 to chunk with fast_split instead of RecursiveCharacterTextSplitter
+FAST_SPLIT = os.getenv("TAS_FAST_SPLIT") == "1"
+
+# Saved FAISS index (rebuilt only when the PDF is newer than it)
+INDEX_DIR = "tas_faiss_index"
+INDEX_FILE = os.path.join(INDEX_DIR, "index.faiss")
+
+# Chunks per embedding request, and how many requests may be in flight at once
+EMBED_BATCH_SIZE = 64
+EMBED_CONCURRENCY = 8
+
+def _index_is_current() -> bool:
+    """
+    Check whether a saved index exists and was built after the PDF last changed.
+    A saved index is used as-is when the PDF is not on disk, since it cannot be rebuilt.
+    """
+    if not os.path.exists(INDEX_FILE):
+        return False
+    if not os.path.exists(PDF_PATH):
+        return True
+    return os.path.getmtime(INDEX_FILE) > os.path.getmtime(PDF_PATH)
+
+def fast_split(text: str, size: int = 800, overlap: int = 200) -> List[str]:
+    """
+    Split text into chunks of at most `size` characters in a single regex pass.
+    Chunks end at the last sentence or paragraph break that fits (or are cut hard
+    if there is none), and each chunk starts about `overlap` characters before
+    the end of the previous one, at a break where possible.
+    """
+    breaks = [m.end() for m in _BREAK_RE.finditer(text)]
+    chunks = []
+    start = 0
+    while start < len(text):
+        # End at the furthest break that keeps the chunk within size
+        i = bisect_right(breaks, start + size) - 1
+        end = breaks[i] if i >= 0 and breaks[i] > start else min(start + size, len(text))
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        
+        # Back up by the overlap, snapping forward to the next break before the end
+        next_start = end - overlap
+        if next_start <= start:
+            next_start = end
+        else:
+            j = bisect_left(breaks, next_start)
+            if j < len(breaks) and breaks[j] < end:
+                next_start = breaks[j]
+        start = next_start
+    return chunks
+
+async def _embed_texts(embeddings, texts):
+    """Embed texts in concurrent batches so API round-trips overlap instead of queueing."""
+    semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+
+    async def embed_batch(batch):
+        async with semaphore:
+            return await embeddings.aembed_documents(batch)
+
+    results = await asyncio.gather(*(
+        embed_batch(texts[i:i + EMBED_BATCH_SIZE])
+        for i in range(0, len(texts), EMBED_BATCH_SIZE)
+    ))
+    return [vector for batch in results for vector in batch]
+
+def _build_vectorstore(embeddings):
+    """Load, chunk and embed the PDF, then save the new index to disk."""
     # Load the PDF document from the local file
     loader = PyPDFLoader(PDF_PATH)
     docs = loader.load()
@@ -37,53 +116,73 @@ try:
     )
 
     # Process each document and add metadata
-    chunks = []
+    texts = []
+    metadatas = []
     for doc in docs:
         # Try to extract section information from the text
         # This helps with providing context in search results
+        # (the regex only runs from the first "Section", if there is one)
         section_info = ""
-        if "Section" in doc.page_content:
-            section_match = re.search(r"Section\s+(\d+[\.\d]*)", doc.page_content)
+        pos = doc.page_content.find("Section")
+        if pos >= 0:
+            section_match = _SECTION_RE.search(doc.page_content, pos)
             if section_match:
                 section_info = section_match.group(0)
         
         # Split the document into chunks
-        doc_chunks = splitter.split_text(doc.page_content)
+        if FAST_SPLIT:
+            doc_chunks = fast_split(doc.page_content)
+        else:
+            doc_chunks = splitter.split_text(doc.page_content)
         
-        # Add metadata to each chunk
+        # Add metadata to each chunk (one dict shared by every chunk of the page)
         # This helps with:
         # 1. Tracking which page the information came from
         # 2. Maintaining source information
         # 3. Preserving section context
-        for chunk in doc_chunks:
-            chunks.append(Document(
-                page_content=chunk,
-                metadata={
-                    "page": doc.metadata.get("page", 0),
-                    "source": "Tasmanian PQM 2024",
-                    "section": section_info
-                }
-            ))
+        page_meta = {
+            "page": doc.metadata.get("page", 0),
+            "source": SOURCE_NAME,
+            "section": section_info
+        }
+        texts.extend(doc_chunks)
+        metadatas.extend([page_meta] * len(doc_chunks))
 
-    # Create embeddings using OpenAI's embedding model
-    # Note: We use OpenAI embeddings because Gemini doesn't provide embedding capabilities
-    # This is a hybrid approach: OpenAI for embeddings, Gemini for text generation
-    embeddings = OpenAIEmbeddings()
+    # Embed all chunks up front with concurrent batched requests
+    vectors = asyncio.run(_embed_texts(embeddings, texts))
 
     # Create a vector store using FAISS (Facebook AI Similarity Search)
     # FAISS is an efficient library for similarity search and clustering of dense vectors
-    vectorstore = FAISS.from_documents(chunks, embeddings)
+    vectorstore = FAISS.from_embeddings(
+        zip(texts, vectors), embeddings,
+        metadatas=metadatas
+    )
 
     # Save the vector store to disk for later use
-    vectorstore.save_local("tas_faiss_index")
+    vectorstore.save_local(INDEX_DIR)
+
+    return vectorstore
+
+def build_retriever():
+    """
+    Load the saved index (building it first if the PDF changed) and return a retriever.
+    Building embeds the chunks with asyncio.run, so call this outside a running event loop.
+    """
+    # Create embeddings using OpenAI's embedding model
+    # Note: We use OpenAI embeddings because Gemini doesn't provide embedding capabilities
+    # This is a hybrid approach: OpenAI for embeddings, Gemini for text generation
+    embeddings = OpenAIEmbeddings(max_retries=5)
 
-    # Reload the vector store and create a retriever
-    # This allows other modules to import and use the retriever
-    vectorstore = FAISS.load_local("tas_faiss_index", embeddings,
-                                   allow_dangerous_deserialization=True)
+    if _index_is_current():
+        # Reuse the saved index instead of re-parsing and re-embedding the PDF
+        vectorstore = FAISS.load_local(INDEX_DIR, embeddings,
+                                       allow_dangerous_deserialization=True)
+    else:
+        # Build and save the index, then use the in-memory copy directly
+        vectorstore = _build_vectorstore(embeddings)
 
     # Create a retriever with specific search parameters
-    retriever_tas = vectorstore.as_retriever(
+    return vectorstore.as_retriever(
         search_type="mmr",  # Maximum Marginal Relevance
         search_kwargs={
             "k": 5,         # Number of documents to retrieve
@@ -92,7 +191,23 @@ try:
         }
     )
 
-    print("[tas_index] retriever_tas ready.")
+# Shared retriever, created on first use so importing this module stays cheap
+_retriever: Optional[Any] = None
 
-except Exception as e:
-    print(f"An error occurred: {e}")
+def get_retriever():
+    """Return the shared PQM retriever, loading (or building) the index on first use."""
+    global _retriever
+    if _retriever is None:
+        _retriever = build_retriever()
+    return _retriever
+
+def __getattr__(name: str) -> Any:
+    """Keep `from tas_index import retriever_tas` working without loading the index at import time."""
+    if name == "retriever_tas":
+        return get_retriever()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+if __name__ == "__main__":
+    # Errors (missing PDF, API failures) propagate so a failed build is never reported as ready
+    retriever_tas = get_retriever()
+    print("[tas_index] retriever_tas ready.")
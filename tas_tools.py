@@ -2,263 +2,272 @@
 # This file creates a LangChain Tool that provides structured answers about Tasmanian fruit fly import requirements
 # It uses the simplified fruit fly database to assess risk and provide ICA conditions
 
-from langchain.agents import Tool
-from tas_data import fruit_fly_db
-from typing import Optional
+import os
+import re
+from functools import lru_cache
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field
+from tas_data import CommodityInfo, get_db
+from typing import Any, Dict, FrozenSet, List, Literal, Optional, Set, Tuple, get_args
 
+# State and territory codes accepted as an origin
+StateCode = Literal["QLD", "NSW", "VIC", "WA", "NT", "SA", "TAS", "ACT"]
+_STATE_CODES = frozenset(get_args(StateCode))
+
+# Origin state names recognised in free-text questions
+# Tasmania is the fixed destination, so it is never treated as an origin
+_STATE_NAMES = {
+    "queensland": "QLD",
+    "new south wales": "NSW",
+    "victoria": "VIC",
+    "western australia": "WA",
+    "northern territory": "NT",
+    "south australia": "SA",
+    "australian capital territory": "ACT",
+    "qld": "QLD",
+    "nsw": "NSW",
+    "vic": "VIC"
+}
+_STATE_NAME_RE = re.compile(r"\b(" + "|".join(_STATE_NAMES) + r")\b", re.IGNORECASE)
+
+# Short codes that are also English words ("act", "sa") only count when upper case
+_STATE_CODE_RE = re.compile(r"\b(WA|NT|SA|ACT)\b")
+
+# The origin as the fast path accepts it: "from <state>", e.g. "from NSW", "from the ACT",
+# "from Western Australia" (short codes upper case only, as above; "Tasmania" is matched
+# so the fast path can decline questions about sending goods out of Tasmania)
+_FROM_STATE_RE = re.compile(
+    r"(?i:\bfrom\s+(?:the\s+)?)(?:(?i:(" + "|".join(_STATE_NAMES) + r"|tasmania|tas))|(WA|NT|SA|ACT))\b"
+)
+
+# Negations ("I am not from WA") and processed forms ("apple pie", "grape juice") change the
+# answer in ways the fresh-fruit assessment does not cover, so those questions go to the agent
+_NEGATION_RE = re.compile(r"\b(?:not|never|no|without|except)\b|n't\b", re.IGNORECASE)
+_PROCESSED_RE = re.compile(
+    r"\b(?:pies?|juices?|jams?|jelly|jellies|sauces?|wines?(?!\s+grapes?)|ciders?|chutneys?|pastes?|purees?|pulp|"
+    r"cakes?|tarts?|dried|frozen|cooked|canned|tinned|preserved|processed|pickled|dehydrated|powder)\b",
+    re.IGNORECASE
+)
+
+# "commodity, state" passed by the agent as a single string (split at the first comma)
+_COMMODITY_STATE_RE = re.compile(r"\s*([^,]*?)\s*,\s*(.*?)\s*$", re.DOTALL)
+
+# Runs of whitespace collapsed to one space when normalizing commodity names
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Opt-in "did you mean" suggestions for unknown commodities (TAS_FUZZY_SUGGEST=1, needs
+# sentence-transformers). Suggestions are only shown in the not-found error and are never
+# assessed in place of the commodity that was asked about.
+FUZZY_SUGGESTIONS = os.getenv("TAS_FUZZY_SUGGEST") == "1"
+
+# Longest commodity name (in words) looked for in a question, e.g. "japanese plum"
+_MAX_COMMODITY_WORDS = 3
+
+# Plural forms and common variants of commodity names -> the name used in the database
+# (all keys are plurals ending in "s"; _normalize_commodity_name relies on this)
+_PLURAL_TO_SINGULAR: Dict[str, str] = {
+    # Fruits
+    "apples": "apple",
+    "grapes": "grape",
+    "strawberries": "strawberry",
+    "bananas": "banana",
+    "oranges": "sweet orange",  # Most common orange type
+    "lemons": "lemon",
+    "limes": "lime",
+    "peaches": "peach",
+    "nectarines": "nectarine",
+    "plums": "plum",
+    "cherries": "sweet cherry",
+    "apricots": "apricot",
+    "pears": "pear",
+    "mangoes": "mango",
+    "mangos": "mango",
+    "avocados": "avocado",
+    "tomatoes": "tomato",
+    "capsicums": "capsicum",
+    "chillies": "chilli",
+    "chilis": "chilli",
+    "papayas": "papaya",
+    "guavas": "guava",
+    "lychees": "lychee",
+    "longans": "longan",
+    "rambutans": "rambutan",
+    "passionfruits": "passionfruit",
+    "dragonfruits": "dragon fruit",
+    "dragon fruits": "dragon fruit",
+    "custard apples": "custard apple",
+    "breadfruits": "breadfruit",
+    "jackfruits": "jackfruit",
+    "starfruits": "star fruit",
+    "star fruits": "star fruit",
+    "feijoas": "feijoa",
+    "kiwifruits": "kiwifruit",
+    "kiwi fruits": "kiwifruit",
+    "persimmons": "persimmon",
+    "figs": "fig",
+    "quinces": "quince",
+    "tamarillos": "tamarillo",
+    "loquats": "loquat",
+    "kumquats": "kumquat",
+    "pomegranates": "pomegranate",
+    "nashis": "nashi",
+    "rollinias": "rollinia",
+    "blackberries": "blackberry",
+    "raspberries": "raspberry",
+    "loganberries": "loganberry",
+    "boysenberries": "boysenberry",
+    "youngberries": "youngberry",
+    "blueberries": "blueberry",
+    "dates": "date",
+    "olives": "olive",
+    "coffee cherries": "coffee cherry",
+    "coffee beans": "coffee cherry",  # Common term for coffee fruit
+
+    # Vegetables
+    "eggplants": "eggplant",
+    "aubergines": "eggplant",
+    "pepinos": "pepino",
+
+    # Common variations
+    "table grapes": "grape",
+    "wine grapes": "grape",
+    "seedless grapes": "grape",
+    "red grapes": "grape",
+    "white grapes": "grape",
+    "green grapes": "grape",
+    "black grapes": "grape",
+    "sweet oranges": "sweet orange",
+    "navel oranges": "sweet orange",
+    "valencia oranges": "sweet orange",
+    "blood oranges": "sweet orange",
+    "mandarins": "mandarin",
+    "tangerines": "mandarin",
+    "clementines": "mandarin",
+    "satsumas": "mandarin",
+    "grapefruits": "grapefruit",
+    "pink grapefruits": "grapefruit",
+    "white grapefruits": "grapefruit",
+    "red grapefruits": "grapefruit",
+    "pomelos": "pummelo",
+    "pummelos": "pummelo",
+    "tangelos": "tangelo",
+    "citrons": "citron",
+    "meyer lemons": "meyer lemon",
+    "rangpur limes": "rangpur lime",
+    "tahitian limes": "tahitian lime",
+    "seville oranges": "seville orange",
+    "desert limes": "desert lime",
+    "japanese plums": "japanese plum",
+    "sour cherries": "sour cherry",
+    "plumcots": "plumcot",
+    "peacharines": "peacharine",
+    "black sapotes": "black sapote",
+    "white sapotes": "white sapote",
+    "star apples": "star apple",
+    "rose apples": "rose apple",
+    "mountain apples": "mountain apple",
+    "wax apples": "wax apple",
+    "spanish cherries": "spanish cherry",
+    "madagascar olives": "madagascar olive",
+    "bourbon oranges": "bourbon orange",
+    "mamey sapotes": "mamey sapote",
+    "surinam cherries": "surinam cherry",
+    "grumichamas": "grumichama",
+    "jaboticabas": "jaboticaba",
+    "monsteras": "monstera",
+    "mulberries": "mulberry",
+    "mock oranges": "mock orange",
+    "granadillas": "granadilla",
+    "cape gooseberries": "cape gooseberry",
+    "abius": "abiu",
+    "durians": "durian",
+    "mangosteens": "mangosteen",
+    "walnuts": "walnut",
+    "aceroas": "acerola",
+    "crab apples": "crab apple",
+    "sapodillas": "sapodilla",
+    "japanese persimmons": "japanese persimmon",
+    "tropical almonds": "tropical almond",
+    "chebulic myrobalans": "chebulic myrobalan",
+    "cacaos": "cacao",
+    "cashew apples": "cashew apple",
+    "cherimoyas": "cherimoya",
+    "pond apples": "pond apple",
+    "soursops": "soursop",
+    "akee apples": "akee apple",
+    "babacos": "babaco",
+    "natal plums": "natal plum",
+    "hawthorns": "hawthorn",
+    "excelsa coffees": "excelsa coffee",
+    "liberian coffees": "liberian coffee",
+    "robusta coffees": "robusta coffee",
+    "lilly pillies": "lilly pilly",
+    "jerusalem cherries": "jerusalem cherry",
+    "jew plums": "jew plum",
+    "jambus": "jambu",
+    "prickly pears": "prickly pear",
+    "almonds": "almond",
+    "sweet cherries": "sweet cherry",
+    "mombins": "mombin",
+}
+
+@lru_cache(maxsize=2048)
 def _normalize_commodity_name(commodity_name: str) -> str:
     """
     Normalize commodity names to handle plurals and common variations.
     This converts common plural forms to singular to match the database.
     """
-    name = commodity_name.lower().strip()
+    # Collapse inner whitespace ("navel  oranges") and casefold in one pass each
+    name = _WHITESPACE_RE.sub(" ", commodity_name).strip().casefold()
     
-    # Common plural to singular mappings
-    plural_to_singular = {
-        # Fruits
-        "apples": "apple",
-        "grapes": "grape", 
-        "strawberries": "strawberry",
-        "bananas": "banana",
-        "oranges": "sweet orange",  # Most common orange type
-        "lemons": "lemon",
-        "limes": "lime",
-        "peaches": "peach",
-        "nectarines": "nectarine",
-        "plums": "plum",
-        "cherries": "sweet cherry",
-        "apricots": "apricot",
-        "pears": "pear",
-        "mangoes": "mango",
-        "mangos": "mango",
-        "avocados": "avocado",
-        "tomatoes": "tomato",
-        "capsicums": "capsicum",
-        "chillies": "chilli",
-        "chilis": "chilli",
-        "papayas": "papaya",
-        "guavas": "guava",
-        "lychees": "lychee",
-        "longans": "longan",
-        "rambutans": "rambutan",
-        "passionfruits": "passionfruit",
-        "dragonfruits": "dragon fruit",
-        "dragon fruits": "dragon fruit",
-        "custard apples": "custard apple",
-        "breadfruits": "breadfruit",
-        "jackfruits": "jackfruit",
-        "starfruits": "star fruit",
-        "star fruits": "star fruit",
-        "feijoas": "feijoa",
-        "kiwifruits": "kiwifruit",
-        "kiwi fruits": "kiwifruit",
-        "persimmons": "persimmon",
-        "figs": "fig",
-        "quinces": "quince",
-        "tamarillos": "tamarillo",
-        "loquats": "loquat",
-        "kumquats": "kumquat",
-        "pomegranates": "pomegranate",
-        "nashis": "nashi",
-        "rollinias": "rollinia",
-        "blackberries": "blackberry",
-        "raspberries": "raspberry",
-        "loganberries": "loganberry",
-        "boysenberries": "boysenberry",
-        "youngberries": "youngberry",
-        "blueberries": "blueberry",
-        "dates": "date",
-        "olives": "olive",
-        "coffee cherries": "coffee cherry",
-        "coffee beans": "coffee cherry",  # Common term for coffee fruit
-        
-        # Vegetables
-        "eggplants": "eggplant",
-        "aubergines": "eggplant",
-        "pepinos": "pepino",
-        
-        # Common variations
-        "table grapes": "grape",
-        "wine grapes": "grape",
-        "seedless grapes": "grape",
-        "red grapes": "grape",
-        "white grapes": "grape",
-        "green grapes": "grape",
-        "black grapes": "grape",
-        "sweet oranges": "sweet orange",
-        "navel oranges": "sweet orange",
-        "valencia oranges": "sweet orange",
-        "blood oranges": "sweet orange",
-        "mandarins": "mandarin",
-        "tangerines": "mandarin",
-        "clementines": "mandarin",
-        "satsumas": "mandarin",
-        "grapefruits": "grapefruit",
-        "pink grapefruits": "grapefruit",
-        "white grapefruits": "grapefruit",
-        "red grapefruits": "grapefruit",
-        "pomelos": "pummelo",
-        "pummelos": "pummelo",
-        "tangelos": "tangelo",
-        "citrons": "citron",
-        "meyer lemons": "meyer lemon",
-        "rangpur limes": "rangpur lime",
-        "tahitian limes": "tahitian lime",
-        "seville oranges": "seville orange",
-        "desert limes": "desert lime",
-        "japanese plums": "japanese plum",
-        "sour cherries": "sour cherry",
-        "plumcots": "plumcot",
-        "peacharines": "peacharine",
-        "black sapotes": "black sapote",
-        "white sapotes": "white sapote",
-        "star apples": "star apple",
-        "rose apples": "rose apple",
-        "mountain apples": "mountain apple",
-        "wax apples": "wax apple",
-        "spanish cherries": "spanish cherry",
-        "madagascar olives": "madagascar olive",
-        "bourbon oranges": "bourbon orange",
-        "mamey sapotes": "mamey sapote",
-        "surinam cherries": "surinam cherry",
-        "grumichamas": "grumichama",
-        "jaboticabas": "jaboticaba",
-        "monsteras": "monstera",
-        "mulberries": "mulberry",
-        "mock oranges": "mock orange",
-        "granadillas": "granadilla",
-        "cape gooseberries": "cape gooseberry",
-        "abius": "abiu",
-        "durians": "durian",
-        "mangosteens": "mangosteen",
-        "walnuts": "walnut",
-        "aceroas": "acerola",
-        "crab apples": "crab apple",
-        "sapodillas": "sapodilla",
-        "japanese persimmons": "japanese persimmon",
-        "tropical almonds": "tropical almond",
-        "chebulic myrobalans": "chebulic myrobalan",
-        "cacaos": "cacao",
-        "cashew apples": "cashew apple",
-        "cherimoyas": "cherimoya",
-        "pond apples": "pond apple",
-        "soursops": "soursop",
-        "akee apples": "akee apple",
-        "babacos": "babaco",
-        "natal plums": "natal plum",
-        "hawthorns": "hawthorn",
-        "excelsa coffees": "excelsa coffee",
-        "liberian coffees": "liberian coffee",
-        "robusta coffees": "robusta coffee",
-        "lilly pillies": "lilly pilly",
-        "jerusalem cherries": "jerusalem cherry",
-        "jew plums": "jew plum",
-        "jambus": "jambu",
-        "tahitian limes": "tahitian lime",
-        "rangpur limes": "rangpur lime",
-        "meyer lemons": "meyer lemon",
-        "seville oranges": "seville orange",
-        "desert limes": "desert lime",
-        "pummelos": "pummelo",
-        "tahitian limes": "tahitian lime",
-        "citrons": "citron",
-        "meyer lemons": "meyer lemon",
-        "grapefruits": "grapefruit",
-        "mandarins": "mandarin",
-        "rangpur limes": "rangpur lime",
-        "sweet oranges": "sweet orange",
-        "tangelos": "tangelo",
-        "coffee cherries": "coffee cherry",
-        "excelsa coffees": "excelsa coffee",
-        "liberian coffees": "liberian coffee",
-        "robusta coffees": "robusta coffee",
-        "hawthorns": "hawthorn",
-        "quinces": "quince",
-        "tamarillos": "tamarillo",
-        "persimmons": "persimmon",
-        "black sapotes": "black sapote",
-        "japanese persimmons": "japanese persimmon",
-        "durians": "durian",
-        "loquats": "loquat",
-        "grumichamas": "grumichama",
-        "surinam cherries": "surinam cherry",
-        "longans": "longan",
-        "figs": "fig",
-        "kumquats": "kumquat",
-        "strawberries": "strawberry",
-        "mangosteens": "mangosteen",
-        "dragonfruits": "dragon fruit",
-        "dragon fruits": "dragon fruit",
-        "walnuts": "walnut",
-        "lychees": "lychee",
-        "aceroas": "acerola",
-        "apples": "apple",
-        "crab apples": "crab apple",
-        "mangoes": "mango",
-        "mangos": "mango",
-        "sapodillas": "sapodilla",
-        "spanish cherries": "spanish cherry",
-        "monsteras": "monstera",
-        "mulberries": "mulberry",
-        "mock oranges": "mock orange",
-        "bananas": "banana",
-        "jaboticabas": "jaboticaba",
-        "rambutans": "rambutan",
-        "madagascar olives": "madagascar olive",
-        "bourbon oranges": "bourbon orange",
-        "olives": "olive",
-        "prickly pears": "prickly pear",
-        "passionfruits": "passionfruit",
-        "granadillas": "granadilla",
-        "avocados": "avocado",
-        "dates": "date",
-        "cape gooseberries": "cape gooseberry",
-        "mamey sapotes": "mamey sapote",
-        "almonds": "almond",
-        "apricots": "apricot",
-        "sweet cherries": "sweet cherry",
-        "sour cherries": "sour cherry",
-        "plums": "plum",
-        "plumcots": "plumcot",
-        "peaches": "peach",
-        "nectarines": "nectarine",
-        "peacharines": "peacharine",
-        "guavas": "guava",
-        "pomegranates": "pomegranate",
-        "nashis": "nashi",
-        "pears": "pear",
-        "rollinias": "rollinia",
-        "blackberries": "blackberry",
-        "raspberries": "raspberry",
-        "loganberries": "loganberry",
-        "boysenberries": "boysenberry",
-        "youngberries": "youngberry",
-        "tomatoes": "tomato",
-        "eggplants": "eggplant",
-        "pepinos": "pepino",
-        "jerusalem cherries": "jerusalem cherry",
-        "jew plums": "jew plum",
-        "mombins": "mombin",
-        "jambus": "jambu",
-        "rose apples": "rose apple",
-        "mountain apples": "mountain apple",
-        "wax apples": "wax apple",
-        "lilly pillies": "lilly pilly",
-        "tropical almonds": "tropical almond",
-        "chebulic myrobalans": "chebulic myrobalan",
-        "cacaos": "cacao",
-        "blueberries": "blueberry",
-        "grapes": "grape"
-    }
+    # Every key in the plural mapping ends in "s", so singular names skip the lookup
+    if not name.endswith("s"):
+        return name
+    
+    # If not in the plural mapping, return the name as is (might already be singular)
+    return _PLURAL_TO_SINGULAR.get(name, name)
+
+@lru_cache(maxsize=2048)
+def _resolve_commodity(commodity_name: str) -> Optional[CommodityInfo]:
+    """Find the database commodity for a normalized name, or None if nothing matches."""
+    db = get_db()
     
-    # Check if the name is in our plural mapping
-    if name in plural_to_singular:
-        return plural_to_singular[name]
+    # Try exact match first
+    commodity = db.get_commodity_info(commodity_name)
+    if commodity:
+        return commodity
     
-    # If not found, return the original name (might already be singular)
-    return name
+    # Fall back to substring search
+    matches = db.search_commodities(commodity_name)
+    return matches[0] if matches else None
+
+# ICA conditions by code, as listed in an answer
+_ICA_CONDITIONS = {
+    "ICA-1": "ICA-1: Queensland Fruit Fly Hosts",
+    "ICA-2": "ICA-2: Mediterranean Fruit Fly Hosts",
+}
+
+# Treatments and documents required whenever a fruit fly risk is detected
+_TREATMENTS = (
+    "Cold treatment: 1°C for 14 days",
+    "Heat treatment: 47°C for 20 minutes",
+    "Fumigation: Methyl bromide or phosphine",
+)
+_DOCUMENTS = (
+    "Phytosanitary certificate with treatment details",
+    "Treatment certificate",
+    "Notice of Intention (NOI) 24h before arrival",
+)
 
-def fruit_fly_assessment(query: str, origin_state: Optional[str] = None) -> str:
+def _normalize_state(state: str) -> Optional[str]:
+    """The state code for a code or full state name (e.g. "wa", "Victoria"), or None if unrecognised."""
+    name = _WHITESPACE_RE.sub(" ", state).strip()
+    if name.upper() in _STATE_CODES:
+        return name.upper()
+    match = _STATE_NAME_RE.fullmatch(name)
+    return _STATE_NAMES[match.group(1).lower()] if match else None
+
+def fruit_fly_assessment(query: str, origin_state: Optional[str] = None) -> Dict[str, Any]:
     """
     Main assessment function for fruit fly conditions.
     
@@ -268,121 +277,246 @@ def fruit_fly_assessment(query: str, origin_state: Optional[str] = None) -> str:
     3. Check if the origin state has the relevant fruit fly
     4. Provide appropriate ICA conditions
     
+    Returns the assessment as a dict (or {"error": message}); use
+    format_fruit_fly_assessment() to render it as markdown.
+    
     Args:
         query: The commodity to assess (e.g., "table grapes", "apples") or "commodity, state" format
         origin_state: Optional state of origin (e.g., "NSW", "VIC", "WA")
     """
     # Handle the case where the agent passes "commodity, state" as a single string
-    if "," in query and not origin_state:
-        parts = query.split(",", 1)
-        if len(parts) == 2:
-            commodity_name = parts[0].strip()
-            origin_state = parts[1].strip()
-        else:
-            return "ERROR: Invalid input format. Expected 'commodity, state' or separate parameters."
+    match = None if origin_state else _COMMODITY_STATE_RE.match(query)
+    if match:
+        commodity_name, origin_state = match.groups()
     else:
         commodity_name = query
     
     if not origin_state:
-        return "ERROR: Origin state is required for fruit fly assessment. Please specify the state of origin."
+        return {"error": "ERROR: Origin state is required for fruit fly assessment. Please specify the state of origin."}
+    
+    # Presence is looked up by state code, so an unrecognised origin must not read as "no risk"
+    state_code = _normalize_state(origin_state)
+    if not state_code:
+        return {"error": f"ERROR: Unknown origin state '{origin_state}'. Please give an Australian state or territory, e.g. 'NSW', 'VIC' or 'Western Australia'."}
+    origin_state = state_code
     
     # Clean up and normalize the commodity name (handle plurals)
     commodity_name = _normalize_commodity_name(commodity_name)
     
-    # Try exact match first
-    commodity = fruit_fly_db.get_commodity_info(commodity_name)
+    commodity = _resolve_commodity(commodity_name)
     if not commodity:
-        # Try search
-        matches = fruit_fly_db.search_commodities(commodity_name)
-        if matches:
-            commodity = matches[0]
-        else:
-            return f"ERROR: Commodity '{commodity_name}' not found in fruit fly host database."
+        error = f"ERROR: Commodity '{commodity_name}' not found in fruit fly host database."
+        suggestions = get_db().fuzzy_match_commodity(commodity_name) if FUZZY_SUGGESTIONS else []
+        if suggestions:
+            error += f" Did you mean: {', '.join(c.name for c in suggestions)}?"
+        return {"error": error}
     
     # Assess fruit fly risk
-    risk_assessment = fruit_fly_db.assess_fruit_fly_risk(commodity.name, origin_state)
+    risk_assessment = get_db().assess_fruit_fly_risk(commodity.name, origin_state)
     
-    if "error" in risk_assessment:
-        return risk_assessment["error"]
+    if risk_assessment.error:
+        return {"error": risk_assessment.error}
     
-    # Build response
-    response_parts = []
-    response_parts.append(f"**Commodity**: {commodity.name}")
-    response_parts.append(f"**Origin State**: {origin_state}")
-    response_parts.append(f"**Destination**: Tasmania")
-    response_parts.append("")
+    at_risk = risk_assessment.qff_risk or risk_assessment.mff_risk
+    ica_codes = []
+    if risk_assessment.qff_risk:
+        ica_codes.append("ICA-1")
+    if risk_assessment.mff_risk:
+        ica_codes.append("ICA-2")
     
-    # Fruit fly host status
-    if commodity.is_fruit_fly_host:
-        response_parts.append("**Fruit Fly Host Status**:")
-        if commodity.qff_host:
-            response_parts.append(f"• Queensland Fruit Fly (QFF) host: YES")
-        if commodity.mff_host:
-            response_parts.append(f"• Mediterranean Fruit Fly (MFF) host: YES")
-        response_parts.append("")
-    else:
-        response_parts.append("**Fruit Fly Host Status**: NOT a fruit fly host")
-        response_parts.append("")
+    return {
+        "commodity": commodity.name,
+        "origin_state": origin_state,
+        "qff_host": commodity.qff_host,
+        "mff_host": commodity.mff_host,
+        "qff_risk": risk_assessment.qff_risk,
+        "mff_risk": risk_assessment.mff_risk,
+        "risk_details": list(risk_assessment.risk_details),
+        "ica_codes": ica_codes,
+        "treatments": list(_TREATMENTS) if at_risk else [],
+        "documents": list(_DOCUMENTS) if at_risk else []
+    }
+
+def format_fruit_fly_assessment(assessment: Dict[str, Any]) -> str:
+    """
+    Render a fruit_fly_assessment result as the markdown response.
+    Uses the same layout as the fruit_fly_answer tool, so fast-path and agent answers match.
+    """
+    if "error" in assessment:
+        return assessment["error"]
     
-    # Risk assessment
-    if risk_assessment["qff_risk"] or risk_assessment["mff_risk"]:
-        response_parts.append("**⚠️ FRUIT FLY RISK DETECTED**:")
-        for detail in risk_assessment["risk_details"]:
-            response_parts.append(f"• {detail}")
-        response_parts.append("")
-        
-        # ICA conditions for fruit fly hosts
-        response_parts.append("**Required ICA Conditions**:")
-        if risk_assessment["qff_risk"]:
-            response_parts.append("• **ICA-1**: Queensland Fruit Fly Hosts")
-            response_parts.append("  - Must be treated with approved treatment")
-            response_parts.append("  - Must have valid phytosanitary certificate")
-            response_parts.append("  - Must be free from fruit fly")
-        if risk_assessment["mff_risk"]:
-            response_parts.append("• **ICA-2**: Mediterranean Fruit Fly Hosts")
-            response_parts.append("  - Must be treated with approved treatment")
-            response_parts.append("  - Must have valid phytosanitary certificate")
-            response_parts.append("  - Must be free from fruit fly")
-        response_parts.append("")
-        
-        response_parts.append("**Treatment Requirements**:")
-        response_parts.append("• Cold treatment: 1°C for 14 days")
-        response_parts.append("• Heat treatment: 47°C for 20 minutes")
-        response_parts.append("• Fumigation: Methyl bromide or phosphine")
-        response_parts.append("")
-        
-        response_parts.append("**Documentation Required**:")
-        response_parts.append("• Phytosanitary certificate with treatment details")
-        response_parts.append("• Treatment certificate")
-        response_parts.append("• Notice of Intention (NOI) 24h before arrival")
-        response_parts.append("")
-        
-    else:
-        response_parts.append("**✅ NO FRUIT FLY RISK**:")
-        response_parts.append("• No fruit fly hosts present in origin state")
-        response_parts.append("• No specific ICA conditions required for fruit fly")
-        response_parts.append("")
-        
-        if commodity.is_fruit_fly_host:
-            response_parts.append("**Note**: While this commodity is a fruit fly host, the relevant fruit fly is not present in the origin state.")
-        response_parts.append("")
+    return render_fruit_fly_answer(
+        commodity=assessment["commodity"],
+        origin=assessment["origin_state"],
+        qff_host=assessment["qff_host"],
+        mff_host=assessment["mff_host"],
+        risk_details=assessment["risk_details"],
+        ica_conditions=[_ICA_CONDITIONS[code] for code in assessment["ica_codes"]],
+        treatments=assessment["treatments"],
+        docs=assessment["documents"]
+    )
+
+def _find_origin_states(text: str) -> Set[str]:
+    """Find the origin state codes mentioned in a free-text question."""
+    states = {_STATE_NAMES[m.lower()] for m in _STATE_NAME_RE.findall(text)}
+    states.update(_STATE_CODE_RE.findall(text))
+    return states
+
+def _find_commodities(text: str) -> Set[str]:
+    """
+    Find the known commodities mentioned in a free-text question.
+    Longer names are matched first so "custard apples" is not also read as "apple".
+    """
+    db = get_db()
+    
+    # Names and their regular plurals, matched in a single pass over the text
+    found = {commodity.name for commodity in db.find_commodities_in_text(text)}
+    
+    # Irregular forms and aliases (e.g. "navel oranges") via the normalization map
+    words: List[str] = re.findall(r"[a-z]+", text.lower())
+    
+    i = 0
+    while i < len(words):
+        for n in range(min(_MAX_COMMODITY_WORDS, len(words) - i), 0, -1):
+            commodity = db.get_commodity_info(_normalize_commodity_name(" ".join(words[i:i + n])))
+            if commodity:
+                found.add(commodity.name)
+                i += n
+                break
+        else:
+            i += 1
+    
+    return found
+
+def question_scope(query: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """
+    The origin states and commodities named in a question.
+    Two questions only have the same answer if both of these match.
+    """
+    return frozenset(_find_origin_states(query)), frozenset(_find_commodities(query))
+
+def _fast_path_origin(query: str) -> Optional[str]:
+    """
+    The origin state code of a question the fast path can answer, or None.
+    The question must name exactly one origin, as "from <state>", that is not Tasmania,
+    with no negation and no processed form of the commodity.
+    """
+    origins = _FROM_STATE_RE.findall(query)
+    if len(origins) != 1:
+        return None
+    
+    name, code = origins[0]
+    origin = code or _STATE_NAMES.get(name.lower())
+    if origin is None:
+        # Tasmania as the origin: not an import into Tasmania
+        return None
     
-    # Generic footer
-    response_parts.append("⚠️  **Pre-entry Requirements**:")
-    response_parts.append("• Lodge a *Notice of Intention (NoI) to Import* with Biosecurity Tasmania at least **24 h before the consignment arrives**")
-    response_parts.append("• Attach required phytosanitary certificates")
-    response_parts.append("• Ensure all treatment requirements are met")
+    # Any other state named in the question (e.g. a destination) makes it ambiguous
+    if _find_origin_states(query) != {origin}:
+        return None
     
-    return "\n".join(response_parts)
+    if _NEGATION_RE.search(query) or _PROCESSED_RE.search(query):
+        return None
+    
+    return origin
+
+def fast_path(query: str) -> Optional[str]:
+    """
+    Answer a question directly from the fruit fly database, without the LLM.
+    Only applies when the question names exactly one known commodity and brings it
+    "from" one origin state; returns None for anything ambiguous so the agent can handle it.
+    """
+    origin = _fast_path_origin(query)
+    if origin is None:
+        return None
+    
+    commodities = _find_commodities(query)
+    if len(commodities) != 1:
+        return None
+    
+    return format_fruit_fly_assessment(fruit_fly_assessment(commodities.pop(), origin))
+
+class FruitFlyAssessmentInput(BaseModel):
+    """Arguments for the fruit_fly_assessment tool."""
+    commodity: str = Field(description="Commodity name, e.g. 'table grapes' or 'apples'")
+    origin_state: StateCode = Field(description="State or territory code of origin, e.g. 'NSW', 'VIC' or 'WA'")
+
+def _run_fruit_fly_assessment(commodity: str, origin_state: str) -> Dict[str, Any]:
+    """
+    Entry point for the structured tool call.
+    Returns the structured assessment so the model reads compact fields rather than
+    the full markdown, which is only rendered for the final answer.
+    """
+    return fruit_fly_assessment(commodity, origin_state)
 
 # Expose as LangChain tool for use in the agent
-fruit_fly_tool = Tool(
+# The args schema lets the model emit a validated structured tool call
+fruit_fly_tool = StructuredTool.from_function(
+    func=_run_fruit_fly_assessment,
     name="fruit_fly_assessment",
-    func=fruit_fly_assessment,
+    args_schema=FruitFlyAssessmentInput,
     description=(
         "Assess fruit fly conditions for importing commodities into Tasmania. "
-        "Input = commodity name (e.g. 'table grapes', 'apples') or 'commodity, state' format. "
-        "Specify origin state (e.g., 'NSW', 'VIC', 'WA'). "
-        "Returns ICA conditions and treatment requirements."
+        "Requires the commodity name (e.g. 'table grapes', 'apples') and the origin state code "
+        "(e.g. 'NSW', 'VIC', 'WA'). "
+        "Returns host status, risk details, ICA codes, treatments and required documents."
+    )
+)
+
+class FruitFlyAnswer(BaseModel):
+    """The variable parts of a fruit fly answer; the markdown layout is rendered in Python."""
+    commodity: str = Field(description="Commodity name as assessed")
+    origin: str = Field(description="State or territory of origin")
+    qff_host: bool = Field(description="Whether the commodity is a Queensland Fruit Fly host")
+    mff_host: bool = Field(description="Whether the commodity is a Mediterranean Fruit Fly host")
+    risk_details: List[str] = Field(default_factory=list, description="Fruit fly risks detected (empty if none)")
+    ica_conditions: List[str] = Field(default_factory=list, description="Applicable ICA conditions")
+    treatments: List[str] = Field(default_factory=list, description="Treatment options")
+    docs: List[str] = Field(default_factory=list, description="Required certificates and paperwork")
+
+def _bullets(items: List[str], empty: str) -> List[str]:
+    """Format a list of items as bullet lines, or a single bullet if the list is empty."""
+    return [f"• {item}" for item in items] or [f"• {empty}"]
+
+def render_fruit_fly_answer(commodity: str, origin: str, qff_host: bool, mff_host: bool,
+                            risk_details: Optional[List[str]] = None,
+                            ica_conditions: Optional[List[str]] = None,
+                            treatments: Optional[List[str]] = None,
+                            docs: Optional[List[str]] = None) -> str:
+    """Render a structured fruit fly answer in the agent's response format."""
+    lines = [
+        f"**Commodity**: {commodity}",
+        f"**Origin**: {origin}",
+        "**Destination**: Tasmania",
+        "",
+        "**Fruit Fly Host Status**:",
+        f"• QFF host: {'YES' if qff_host else 'NO'}",
+        f"• MFF host: {'YES' if mff_host else 'NO'}",
+        "",
+        "**Risk Assessment**:",
+        *_bullets(risk_details or [], "No risk detected"),
+        "",
+        "**Required ICA Conditions**:",
+        *_bullets(ica_conditions or [], "None"),
+        "",
+        "**Treatment Requirements**:",
+        *_bullets(treatments or [], "None"),
+        "",
+        "**Documentation Required**:",
+        *_bullets(docs or [], "None")
+    ]
+    return "\n".join(lines)
+
+# Final-answer tool: the model submits only the variable fields as validated JSON
+# and the markdown is rendered here, so the boilerplate is never generated by the LLM
+fruit_fly_answer_tool = StructuredTool.from_function(
+    func=render_fruit_fly_answer,
+    name="fruit_fly_answer",
+    args_schema=FruitFlyAnswer,
+    return_direct=True,
+    description=(
+        "Submit the final answer after running fruit_fly_assessment. "
+        "Provide the commodity, origin, host status and the lists of risks, ICA conditions, "
+        "treatments and documents. The answer is formatted and returned to the user as-is."
     )
 )
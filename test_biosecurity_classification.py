@@ -1,118 +1,54 @@
 #!/usr/bin/env python3
 """
-Test script to verify biosecurity matter classification.
-This tests the classification logic without requiring the full agent.
+Tests for fruit fly risk assessment and commodity lookup.
+Run with: pytest test_biosecurity_classification.py
 """
 
-import os
-from dotenv import load_dotenv
-from tas_data import commodity_db, BiosecurityCategory, CommodityType
+import pytest
 
-# Load environment variables
-load_dotenv()
+# (commodity, origin state, expected QFF risk, expected MFF risk)
+RISK_CASES = [
+    ("grape", "NSW", True, False),
+    ("grape", "WA", False, True),
+    ("grape", "TAS", False, False),
+    ("banana", "VIC", True, False),
+    ("strawberry", "QLD", True, False),
+    ("apple", "SA", True, True),
+]
 
-def test_biosecurity_classification():
-    """Test the biosecurity classification system."""
-    print("🧪 Testing Biosecurity Matter Classification...")
-    print("=" * 60)
-    
-    # Test cases for different categories
-    test_cases = [
-        # Permitted matter examples
-        ("dried nuts", "Should be PERMITTED"),
-        ("honey", "Should be PERMITTED"),
-        ("processed foods", "Should be PERMITTED"),
-        ("commercial pet food", "Should be PERMITTED"),
-        
-        # Prohibited matter examples
-        ("cannabis seeds", "Should be PROHIBITED"),
-        ("opium poppy", "Should be PROHIBITED"),
-        ("tomato yellow leaf curl virus", "Should be PROHIBITED"),
-        ("fire blight", "Should be PROHIBITED"),
-        
-        # Restricted matter examples (default)
-        ("table grapes", "Should be RESTRICTED"),
-        ("nursery stock", "Should be RESTRICTED"),
-        ("citrus plants", "Should be RESTRICTED"),
-        ("potato tubers", "Should be RESTRICTED"),
-    ]
-    
-    for commodity_name, expected in test_cases:
-        print(f"\n📦 Testing: {commodity_name}")
-        print(f"Expected: {expected}")
-        
-        # Test classification
-        classification = commodity_db.classify_biosecurity_matter(commodity_name, CommodityType.FRUIT)
-        
-        print(f"Result: {classification.category.value.upper()}")
-        print(f"Reason: {classification.description}")
-        print(f"Requirements: {classification.requirements}")
-        
-        # Check if classification matches expectation
-        if "PERMITTED" in expected and classification.category == BiosecurityCategory.PERMITTED:
-            print("✅ PASS")
-        elif "PROHIBITED" in expected and classification.category == BiosecurityCategory.PROHIBITED:
-            print("✅ PASS")
-        elif "RESTRICTED" in expected and classification.category == BiosecurityCategory.RESTRICTED:
-            print("✅ PASS")
-        else:
-            print("❌ FAIL - Unexpected classification")
+# Commodities that are not fruit fly hosts in the database
+UNKNOWN_COMMODITIES = ["potato", "nursery stock"]
 
-def test_commodity_lookup():
-    """Test commodity lookup with biosecurity classification."""
-    print("\n" + "=" * 60)
-    print("🔍 Testing Commodity Lookup with Classification...")
-    print("=" * 60)
-    
-    test_commodities = [
-        "table grapes",
-        "potato",
-        "citrus",
-        "nursery stock"
-    ]
-    
-    for commodity in test_commodities:
-        print(f"\n🔍 Looking up: {commodity}")
-        
-        # Try exact lookup
-        result = commodity_db.lookup(commodity)
-        if result:
-            print(f"Found: {result.name}")
-            if result.biosecurity_category:
-                print(f"Classification: {result.biosecurity_category.category.value.upper()}")
-                print(f"Reason: {result.biosecurity_category.description}")
-            else:
-                print("No biosecurity classification found")
-        else:
-            print("Not found in database")
-            
-            # Try search
-            matches = commodity_db.search(commodity)
-            if matches:
-                print(f"Found {len(matches)} similar matches:")
-                for match in matches[:3]:  # Show first 3
-                    print(f"  - {match.name}")
-                    if match.biosecurity_category:
-                        print(f"    Classification: {match.biosecurity_category.category.value.upper()}")
-            else:
-                print("No similar matches found")
+# (query, expected commodity name or None if not a fruit fly host)
+LOOKUP_CASES = [
+    ("grape", "Grape"),
+    ("Apples", "Apple"),
+    (" mango ", "Mango"),
+    ("potato", None),
+    ("nursery stock", None),
+]
 
-def main():
-    """Run all tests."""
-    print("🧪 Testing Biosecurity Classification System...")
-    print("=" * 60)
-    
-    # Test classification logic
-    test_biosecurity_classification()
-    
-    # Test commodity lookup
-    test_commodity_lookup()
-    
-    print("\n" + "=" * 60)
-    print("✅ Biosecurity classification tests completed!")
-    print("\nNext steps:")
-    print("1. Test with the full agent: python agent_setup_tas.py")
-    print("2. Try different commodities to see classification in action")
+@pytest.mark.parametrize("name,state,qff_risk,mff_risk", RISK_CASES)
+def test_risk_assessment(db, name, state, qff_risk, mff_risk):
+    """Each host gets the fruit fly risks of the flies present in its origin state."""
+    assessment = db.assess_fruit_fly_risk(name, state)
+    assert assessment.error is None
+    assert (assessment.qff_risk, assessment.mff_risk) == (qff_risk, mff_risk)
+    assert len(assessment.risk_details) == qff_risk + mff_risk
 
-if __name__ == "__main__":
-    main() 
\ No newline at end of file
+@pytest.mark.parametrize("name", UNKNOWN_COMMODITIES)
+def test_unknown_commodity_risk(db, name):
+    """Commodities missing from the database are reported as errors, never as risk-free."""
+    assessment = db.assess_fruit_fly_risk(name, "NSW")
+    assert assessment.error is not None
+    assert not assessment.qff_risk and not assessment.mff_risk
+
+@pytest.mark.parametrize("name,expected", LOOKUP_CASES)
+def test_commodity_lookup(db, name, expected):
+    """Lookup resolves names and plurals to the database commodity."""
+    commodity = db.get_commodity_info(name)
+    assert (commodity.name if commodity else None) == expected
+
+def test_commodity_search(db):
+    """Search falls back to substring matches, in name order."""
+    assert [c.name for c in db.search_commodities("grape")] == ["Grape", "Grapefruit"]
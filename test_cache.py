@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Tests for the exact-match LLM response cache.
+Run with: pytest test_cache.py
+"""
+
+from cache import LLMCache
+
+def test_get_returns_stored_response(tmp_path):
+    """A stored response is returned for its key, and other keys miss."""
+    cache = LLMCache(str(tmp_path / "cache.sqlite"))
+    key = LLMCache.cache_key("gemini", ["prefix", "apples from NSW"], 0, ["fruit_fly_assessment"])
+    cache.set(key, {"output": "ICA-1 applies"})
+    assert cache.get(key) == {"output": "ICA-1 applies"}
+    assert cache.get(LLMCache.cache_key("gemini", ["prefix", "apples from WA"], 0, ["fruit_fly_assessment"])) is None
+
+def test_expired_response_is_not_returned(tmp_path):
+    """A response past its TTL is treated as missing."""
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), ttl_seconds=-1)
+    cache.set("key", {"output": "stale"})
+    assert cache.get("key") is None
+
+def test_nondeterministic_requests_are_not_keyed():
+    """Requests with temperature > 0 get no cache key."""
+    assert LLMCache.cache_key("gemini", ["prefix", "apples"], 0.7, []) is None
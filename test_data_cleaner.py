@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the scraped-table cleaner in utils/data_cleaner.py.
+Run with: pytest test_data_cleaner.py
+"""
+
+import importlib.util
+import json
+import sys
+import pytest
+from utils import data_cleaner
+from utils.data_cleaner import _clean_page_rows, _row_cleaner, clean_text
+
+# Rows wider than, as wide as, and narrower than the headers, with empty cells and
+# characters that clean_text normalizes
+SAMPLE_ROWS = [
+    ["Apple", "  QFF\n host ", "Yes", "extra cell"],
+    ["Grape", "", "\u201cICA-1\u201d"],
+    ["Mango", "MFF \u2013 host", None],
+    ["Pear"],
+    [],
+    ["", "", ""],
+]
+
+def _plain_clean_rows(rows, headers):
+    """Reference cleaner: the straightforward per-row loop the generated code replaces."""
+    cleaned_rows = []
+    for row in rows:
+        cleaned = {}
+        for header, cell in zip(headers, row):
+            if cell:
+                cleaned[header] = clean_text(cell)
+        if cleaned:
+            cleaned_rows.append(cleaned)
+    return cleaned_rows
+
+@pytest.mark.parametrize("headers", [
+    ["Commodity", "Pest", "Import requirement"],
+    ["Commodity"],
+    ["Commodity", "Commodity", "Notes"],   # duplicate header: the last cell wins
+    [],
+])
+def test_generated_row_cleaner_matches_plain_loop(headers):
+    """The exec-generated cleaner gives the same rows as the plain loop, ragged rows included."""
+    assert _clean_page_rows(SAMPLE_ROWS, headers) == _plain_clean_rows(SAMPLE_ROWS, headers)
+
+def test_generated_row_cleaner_quotes_headers_safely():
+    """Headers are emitted as string literals, so quotes and backslashes are kept as-is."""
+    headers = ("It's \"QFF\"", "C:\\path", "")
+    clean = _row_cleaner(headers)
+    assert clean(["a", "b", "c"], clean_text) == {"It's \"QFF\"": "a", "C:\\path": "b", "": "c"}
+
+RAW_PAGES = [
+    {"page": 83, "rows": [["Commodity", "Pest", "Import requirement"],
+                          ["Apple", "QFF", "ICA-1 \u2013 see\n notes"],
+                          ["Caf\u00e9 grape", "", "\u201cIR 2\u201d"]]},
+    {"page": 84, "rows": []},
+    {"page": 85, "rows": [["Pear", "MFF"], ["", "", ""], ["Mango", "QFF", "ICA-1", "extra"]]},
+]
+
+@pytest.fixture(params=["orjson", "json"])
+def cleaner(request, monkeypatch):
+    """data_cleaner using orjson when installed, or with the stdlib json fallback."""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+        return data_cleaner
+
+    # Load a separate copy of the module with orjson unavailable
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    spec = importlib.util.spec_from_file_location("_data_cleaner_stdlib", data_cleaner.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_streamed_output_matches_non_streamed(cleaner, tmp_path):
+    """A table saved from streamed rows parses to the same payload as one built in memory."""
+    raw_file = tmp_path / "table_2_raw.json"
+    raw_file.write_text(json.dumps(RAW_PAGES))
+
+    table = cleaner.process_raw_json(raw_file)
+    expected = cleaner._to_payload(table)
+
+    cleaner.save_cleaned_data(cleaner.process_raw_json(raw_file, stream=True), tmp_path / "streamed")
+    streamed = (tmp_path / "streamed" / "table_2_cleaned.json").read_bytes()
+    assert json.loads(streamed) == expected
+    assert streamed == cleaner._json_dumps(expected)
+
+    cleaner.save_cleaned_data(cleaner.process_raw_json(raw_file, stream=True), tmp_path / "pretty", pretty=True)
+    assert json.loads((tmp_path / "pretty" / "table_2_cleaned.json").read_bytes()) == expected
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the answers returned by FastPathAgent.
+Run with: pytest test_fast_path.py
+"""
+
+import pytest
+from agent_setup_tas import FastPathAgent
+from tas_constants import GENERIC_TAS_FOOTER
+from tas_tools import fast_path, fruit_fly_assessment, render_fruit_fly_answer
+
+class _StubAgent:
+    """Stands in for the LLM agent on questions the fast path does not answer."""
+
+    def invoke(self, input):
+        return {"input": input["input"], "output": "LLM answer"}
+
+@pytest.mark.parametrize("question", [
+    "Can I bring apples from NSW to Tasmania?",   # fast path, fruit fly risk
+    "Can I bring apples from WA to Tasmania?",    # fast path, MFF risk
+    "Can I bring grapes to Tasmania?",            # no origin state -> agent
+    "Apples or pears from QLD?",                  # two commodities -> agent
+])
+def test_footer_appears_once(question):
+    """Every answer carries the pre-entry footer exactly once, whichever path produced it."""
+    output = FastPathAgent(_StubAgent()).invoke({"input": question})["output"]
+    assert output.count(GENERIC_TAS_FOOTER) == 1
+    assert output.count("Pre-entry") == 1
+
+@pytest.mark.parametrize("question", [
+    "Can I send apples from Tasmania to Victoria?",            # Tasmania is the origin
+    "Can I bring apples into Tasmania? I am not from WA",      # negated origin
+    "Can I bring apple pie from the ACT?",                     # processed goods
+    "Can I bring grape juice from VIC?",                       # processed goods
+    "Can I bring apples to Tasmania via VIC from NSW?",        # two states named
+])
+def test_fast_path_leaves_other_questions_to_agent(question):
+    """Only a plain "from <state>" question about fresh produce is answered from the database."""
+    assert fast_path(question) is None
+
+@pytest.mark.parametrize("question, origin", [
+    ("Can I bring apples from the ACT to Tasmania?", "ACT"),
+    ("Can I bring wine grapes from Western Australia?", "WA"),
+])
+def test_fast_path_reads_origin_after_from(question, origin):
+    """The origin is the state named after "from", given as a code or a full name."""
+    assert f"**Origin**: {origin}" in fast_path(question)
+
+def test_fast_path_uses_answer_layout():
+    """Fast-path answers are rendered by the same function as the agent's final answer."""
+    assessment = fruit_fly_assessment("apple", "NSW")
+    expected = render_fruit_fly_answer(
+        commodity="Apple",
+        origin="NSW",
+        qff_host=assessment["qff_host"],
+        mff_host=assessment["mff_host"],
+        risk_details=assessment["risk_details"],
+        ica_conditions=["ICA-1: Queensland Fruit Fly Hosts"],
+        treatments=assessment["treatments"],
+        docs=assessment["documents"]
+    )
+    assert fast_path("Can I bring apples from NSW to Tasmania?") == expected
+
+def test_unknown_commodity_is_not_guessed():
+    """A commodity missing from the database is reported as not found, never swapped for a similar host."""
+    assessment = fruit_fly_assessment("potato", "NSW")
+    assert assessment["error"].startswith("ERROR: Commodity 'potato' not found")
+
+def test_full_state_name_is_assessed_as_its_code():
+    """An origin given as a full state name gets the same assessment as its state code."""
+    assessment = fruit_fly_assessment("apples, Victoria")
+    assert assessment["origin_state"] == "VIC"
+    assert assessment["qff_risk"]
+    assert assessment == fruit_fly_assessment("apples", "VIC")
+
+def test_unknown_state_is_an_error():
+    """An unrecognised origin is reported, never assessed as a state with no fruit flies."""
+    assessment = fruit_fly_assessment("apples, Narnia")
+    assert assessment["error"].startswith("ERROR: Unknown origin state 'Narnia'")
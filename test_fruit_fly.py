@@ -4,7 +4,7 @@ Test script to verify the fruit fly database functionality.
 This tests the simplified fruit fly assessment system.
 """
 
-from tas_data import fruit_fly_db
+from tas_data import get_db
 
 def test_fruit_fly_database():
     """Test the fruit fly database functionality."""
@@ -13,8 +13,8 @@ def test_fruit_fly_database():
     
     # Test 1: Check if fruit flies are loaded
     print("1. Testing fruit fly data loading:")
-    qff = fruit_fly_db.get_fruit_fly_info("QFF")
-    mff = fruit_fly_db.get_fruit_fly_info("MFF")
+    qff = get_db().get_fruit_fly_info("QFF")
+    mff = get_db().get_fruit_fly_info("MFF")
     
     if qff:
         print(f"✅ QFF loaded: {qff.common_name} ({len(qff.hosts)} hosts)")
@@ -41,7 +41,7 @@ def test_commodity_lookup():
     ]
     
     for commodity in test_commodities:
-        info = fruit_fly_db.get_commodity_info(commodity)
+        info = get_db().get_commodity_info(commodity)
         if info:
             print(f"✅ {commodity}: QFF={info.qff_host}, MFF={info.mff_host}")
         else:
@@ -56,12 +56,38 @@ def test_state_presence():
     test_states = ["NSW", "VIC", "WA", "SA", "TAS"]
     
     for state in test_states:
-        qff_present = fruit_fly_db.is_pest_present_in_state("QFF", state)
-        mff_present = fruit_fly_db.is_pest_present_in_state("MFF", state)
+        qff_present = get_db().is_pest_present_in_state("QFF", state)
+        mff_present = get_db().is_pest_present_in_state("MFF", state)
         print(f"✅ {state}: QFF={qff_present}, MFF={mff_present}")
     
     print()
 
+def test_unlisted_states(db):
+    """Test that pests are only present in explicitly listed states."""
+    print("3b. Testing states not listed as present:")
+    
+    test_cases = [
+        ("QFF", "TAS"),  # Listed as absent
+        ("MFF", "QLD"),  # Listed as absent
+        ("QFF", "ACT"),  # Not listed at all
+        ("MFF", "ACT"),  # Not listed at all
+    ]
+    
+    for pest, state in test_cases:
+        assert not db.is_pest_present_in_state(pest, state), f"{pest} reported as present in {state}"
+        print(f"✅ {pest} in {state}: not present")
+    
+    # A host from a state where neither fruit fly is listed as present carries no risk
+    for state in ("TAS", "ACT"):
+        assessment = db.assess_fruit_fly_risk("apple", state)
+        assert assessment.error is None
+        assert assessment.is_fruit_fly_host
+        assert not assessment.qff_risk and not assessment.mff_risk
+        assert assessment.risk_details == ()
+        print(f"✅ apple from {state}: no fruit fly risk")
+    
+    print()
+
 def test_risk_assessment():
     """Test risk assessment functionality."""
     print("4. Testing risk assessment:")
@@ -76,15 +102,14 @@ def test_risk_assessment():
     ]
     
     for commodity, state in test_cases:
-        assessment = fruit_fly_db.assess_fruit_fly_risk(commodity, state)
-        if "error" not in assessment:
-            risk_level = "HIGH" if assessment["qff_risk"] or assessment["mff_risk"] else "LOW"
+        assessment = get_db().assess_fruit_fly_risk(commodity, state)
+        if not assessment.error:
+            risk_level = "HIGH" if assessment.qff_risk or assessment.mff_risk else "LOW"
             print(f"✅ {commodity} from {state}: {risk_level} risk")
-            if assessment["risk_details"]:
-                for detail in assessment["risk_details"]:
-                    print(f"   - {detail}")
+            for detail in assessment.risk_details:
+                print(f"   - {detail}")
         else:
-            print(f"❌ {commodity} from {state}: {assessment['error']}")
+            print(f"❌ {commodity} from {state}: {assessment.error}")
     
     print()
 
@@ -95,7 +120,7 @@ def test_host_lists():
     test_states = ["NSW", "WA", "TAS"]
     
     for state in test_states:
-        hosts = fruit_fly_db.get_fruit_fly_hosts_for_state(state)
+        hosts = get_db().get_fruit_fly_hosts_for_state(state)
         print(f"✅ {state}:")
         if hosts["QFF"]:
             print(f"   QFF hosts: {len(hosts['QFF'])} (e.g., {hosts['QFF'][:3]})")
@@ -106,6 +131,12 @@ def test_host_lists():
     
     print()
 
+def test_host_lists_are_copies(db):
+    """Changing a returned host list mapping does not change what later callers get."""
+    hosts = db.get_fruit_fly_hosts_for_state("NSW")
+    hosts["QFF"] = ()
+    assert db.get_fruit_fly_hosts_for_state("NSW")["QFF"]
+
 def main():
     """Run all tests."""
     print("🧪 Testing Fruit Fly Assessment System...")
@@ -114,6 +145,7 @@ def main():
     test_fruit_fly_database()
     test_commodity_lookup()
     test_state_presence()
+    test_unlisted_states(get_db())
     test_risk_assessment()
     test_host_lists()
     
@@ -5,60 +5,66 @@ This script tests the basic functionality without requiring the full index.
 """
 
 import os
+import pytest
+from functools import lru_cache
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 # Load environment variables
 load_dotenv()
 
+@lru_cache(maxsize=1)
+def _llm():
+    """Gemini client, built once so repeated runs reuse its connection pool."""
+    return ChatGoogleGenerativeAI(
+        model="gemini-1.5-pro",
+        temperature=0,
+        # The check only needs a short greeting back
+        max_output_tokens=16,
+        convert_system_message_to_human=True
+    )
+
+@lru_cache(maxsize=1)
+def _embeddings():
+    """OpenAI embeddings client, built once so repeated runs reuse its connection pool."""
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings()
+
 def test_gemini_connection():
     """Test that we can connect to Gemini API."""
-    try:
-        # Check if API key is set
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            print("❌ GOOGLE_API_KEY not found in environment")
-            return False
-        
-        # Test basic Gemini connection
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-1.5-pro",
-            temperature=0,
-            convert_system_message_to_human=True
-        )
-        
-        # Simple test query
-        response = llm.invoke("Say 'Hello from Gemini!'")
-        print(f"✅ Gemini connection successful: {response.content}")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Gemini connection failed: {e}")
-        return False
+    # Check if API key is set
+    if not os.getenv("GOOGLE_API_KEY"):
+        pytest.skip("GOOGLE_API_KEY not found in environment")
+    
+    # Simple test query
+    response = _llm().invoke("Say 'Hello from Gemini!'")
+    assert response.content, "Gemini returned an empty response"
+    print(f"✅ Gemini connection successful: {response.content}")
 
 def test_openai_embeddings():
     """Test that OpenAI embeddings work (for vector search)."""
+    # Check if API key is set
+    if not os.getenv("OPENAI_API_KEY"):
+        pytest.skip("OPENAI_API_KEY not found in environment")
+    
+    # Embed a small batch in one request, as the index build does
+    test_texts = [f"This is test embedding {i}" for i in range(8)]
+    vectors = _embeddings().embed_documents(test_texts)
+    
+    assert len(vectors) == len(test_texts), f"expected {len(test_texts)} vectors, got {len(vectors)}"
+    assert all(len(v) == len(vectors[0]) for v in vectors), "embeddings have inconsistent lengths"
+    print(f"✅ OpenAI embeddings successful ({len(vectors)} vectors, length {len(vectors[0])})")
+
+def _passes(test) -> bool:
+    """Run one check outside pytest, reporting a missing key or failure instead of raising."""
     try:
-        # Check if API key is set
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            print("❌ OPENAI_API_KEY not found in environment")
-            return False
-        
-        # Test OpenAI embeddings
-        from langchain_openai import OpenAIEmbeddings
-        embeddings = OpenAIEmbeddings()
-        
-        # Simple test embedding
-        test_text = "This is a test embedding"
-        embedding = embeddings.embed_query(test_text)
-        
-        print(f"✅ OpenAI embeddings successful (vector length: {len(embedding)})")
+        test()
         return True
-        
+    except pytest.skip.Exception as e:
+        print(f"❌ {e.msg}")
     except Exception as e:
-        print(f"❌ OpenAI embeddings failed: {e}")
-        return False
+        print(f"❌ {test.__name__} failed: {e}")
+    return False
 
 def main():
     """Run all tests."""
@@ -66,10 +72,10 @@ def main():
     print("=" * 50)
     
     # Test Gemini
-    gemini_ok = test_gemini_connection()
+    gemini_ok = _passes(test_gemini_connection)
     
     # Test OpenAI embeddings
-    embeddings_ok = test_openai_embeddings()
+    embeddings_ok = _passes(test_openai_embeddings)
     
     print("=" * 50)
     if gemini_ok and embeddings_ok:
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for answer reuse in the semantic cache.
+Run with: pytest test_semantic_cache.py
+"""
+
+import asyncio
+import numpy as np
+from semantic_cache import EMBEDDING_DIM, SemanticCache, SemanticCachedAgent
+from tas_tools import question_scope
+
+class _SameEmbeddingCache(SemanticCache):
+    """Embeds every question identically, so only the scope can tell questions apart."""
+
+    def _encode(self, query):
+        vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+        vector[0] = 1.0
+        return vector
+
+class _RecordingAgent:
+    """Answers with the question it was asked."""
+
+    def invoke(self, input):
+        return {"input": input["input"], "output": input["input"]}
+
+def test_answers_are_not_reused_across_states():
+    """A near-identical question about another origin state gets its own answer."""
+    agent = SemanticCachedAgent(_RecordingAgent(), _SameEmbeddingCache(max_entries=4), scope_fn=question_scope)
+    agent.invoke({"input": "apples from NSW"})
+    assert agent.invoke({"input": "apples from WA"})["output"] == "apples from WA"
+
+def test_answers_are_not_reused_across_commodities():
+    """A near-identical question about another commodity gets its own answer."""
+    agent = SemanticCachedAgent(_RecordingAgent(), _SameEmbeddingCache(max_entries=4), scope_fn=question_scope)
+    agent.invoke({"input": "apples from NSW"})
+    assert agent.invoke({"input": "pears from NSW"})["output"] == "pears from NSW"
+
+def test_paraphrase_with_same_scope_is_reused():
+    """A paraphrase naming the same state and commodity reuses the cached answer."""
+    agent = SemanticCachedAgent(_RecordingAgent(), _SameEmbeddingCache(max_entries=4), scope_fn=question_scope)
+    agent.invoke({"input": "apples from NSW"})
+    assert agent.invoke({"input": "bring apple fruit from New South Wales"})["output"] == "apples from NSW"
+
+def test_async_answers_are_cached():
+    """ainvoke stores and reuses answers through the worker-thread path."""
+    class _AsyncAgent(_RecordingAgent):
+        async def ainvoke(self, input):
+            return self.invoke(input)
+
+    async def ask_twice():
+        agent = SemanticCachedAgent(_AsyncAgent(), _SameEmbeddingCache(max_entries=4), scope_fn=question_scope)
+        await agent.ainvoke({"input": "apples from NSW"})
+        return await agent.ainvoke({"input": "bring apple fruit from New South Wales"})
+
+    assert asyncio.run(ask_twice())["output"] == "apples from NSW"
@@ -1,31 +1,70 @@
 import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
 import re
 
-@dataclass
+# Optional: orjson parses and writes the JSON dumps straight from/to bytes
+try:
+    import orjson
+
+    def _json_loads(data: bytes):
+        return orjson.loads(data)
+
+    def _json_dumps(obj, pretty: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+except ImportError:
+    def _json_loads(data: bytes):
+        return json.loads(data)
+
+    def _json_dumps(obj, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(obj, indent=2).encode('utf-8')
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+# Marks the header row of a PQM table
+_HDR_RE = re.compile(r'import requirement', re.IGNORECASE)
+
+# Smart quotes, en/em dashes and the ellipsis character -> plain ASCII
+_NORMALIZE_CHARS = str.maketrans({
+    '\u201c': '"', '\u201d': '"',   # curly double quotes
+    '\u2018': "'", '\u2019': "'",   # curly single quotes
+    '\u2013': '-', '\u2014': '-',   # en and em dashes
+    '\u2026': '...',                # ellipsis
+})
+
+# Table cells repeat heavily (pest names, states, "Yes"/"No"), so short ones are memoized
+CLEAN_CACHE_SIZE = 65536
+CLEAN_CACHE_MAX_LEN = 512
+
+@dataclass(slots=True)
 class CleanedTable:
     """Structured representation of a cleaned table"""
     name: str
     headers: List[str]
-    rows: List[Dict[str, str]]
+    # A list, or a one-shot iterator when built with process_raw_json(stream=True)
+    rows: Iterable[Dict[str, str]]
     metadata: Dict[str, str]
 
+def _clean_text(text: str) -> str:
+    # split() drops leading/trailing whitespace and collapses runs (same set as regex \s),
+    # then quotes, dashes and ellipses are normalized in one pass
+    return ' '.join(text.split()).translate(_NORMALIZE_CHARS)
+
+_clean_text_cached = lru_cache(maxsize=CLEAN_CACHE_SIZE)(_clean_text)
+
 def clean_text(text: str) -> str:
     """Clean text by removing extra whitespace and normalizing characters"""
     if not text:
         return ""
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text.strip())
-    # Normalize quotes
-    text = text.replace('"', '"').replace('"', '"')
-    text = text.replace(''', "'").replace(''', "'")
-    # Normalize dashes
-    text = text.replace('-', '-').replace('—', '-')
-    # Normalize ellipsis
-    text = text.replace('…', '...')
-    return text
+    # Long, rarely repeated cells bypass the cache so they don't evict common values
+    if len(text) > CLEAN_CACHE_MAX_LEN:
+        return _clean_text(text)
+    return _clean_text_cached(text)
 
 def extract_headers(row: List[str]) -> List[str]:
     """Extract and clean headers from a row"""
@@ -33,82 +72,178 @@ def extract_headers(row: List[str]) -> List[str]:
 
 def clean_row(row: List[str], headers: List[str]) -> Dict[str, str]:
     """Clean a row and convert it to a dictionary"""
-    return {
-        headers[i]: clean_text(cell)
-        for i, cell in enumerate(row)
-        if i < len(headers) and cell
-    }
+    # zip() stops at the shorter of the two, dropping cells past the last header
+    return {header: clean_text(cell) for header, cell in zip(headers, row) if cell}
 
-def process_raw_json(file_path: Path) -> CleanedTable:
-    """Process a raw JSON file and return a cleaned table"""
-    with open(file_path) as f:
-        raw_data = json.load(f)
+@lru_cache(maxsize=32)
+def _row_cleaner(headers: Tuple[str, ...]):
+    """
+    Generate a clean_row equivalent specialized to one header schema.
+    The per-column checks are unrolled, so there is no zip or loop per row; rows must
+    have at least as many cells as there are headers.
+    """
+    targets = "".join(f"c{i}, " for i in range(len(headers)))
+    lines = ["def _clean(row, clean_text):", f"    [{targets}*_] = row", "    cleaned = {}"]
+    # repr() turns each header into a safe string literal
+    lines += [f"    if c{i}: cleaned[{header!r}] = clean_text(c{i})" for i, header in enumerate(headers)]
+    lines.append("    return cleaned")
     
-    # Extract table name from filename
-    table_name = file_path.stem.replace('_raw', '')
-    
-    # Initialize metadata
-    metadata = {
-        "source_file": file_path.name,
-        "page_count": len(raw_data)
-    }
-    
-    # Process all pages
-    all_rows = []
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace["_clean"]
+
+def _clean_page_rows(rows: List[List[str]], headers: List[str]) -> List[Dict[str, str]]:
+    """Clean the rows of one page into dictionaries, skipping empty rows and cells"""
+    clean = _row_cleaner(tuple(headers))
+    width = len(headers)
+    return [
+        cleaned
+        for cleaned in (
+            clean(row, clean_text) if len(row) >= width else clean_row(row, headers)
+            for row in rows if row
+        )
+        if cleaned
+    ]
+
+def _iter_pages(raw_data: List[dict]) -> Iterator[Tuple[List[str], List[List[str]]]]:
+    """Yield each page's raw rows together with the headers that apply to them"""
     headers = []
+    # Width of the matched header row; pages with the same width share its schema
+    header_width = None
     
     for page in raw_data:
         if not page.get("rows"):
             continue
             
-        # Find header row (usually first or second row)
-        for row in page["rows"][:2]:
-            if any("import requirement" in cell.lower() for cell in row if cell):
-                headers = extract_headers(row)
-                break
+        # Find header row (usually first or second row), unless the page has the known shape
+        if len(page["rows"][0]) != header_width:
+            for row in page["rows"][:2]:
+                if any(cell and _HDR_RE.search(cell) for cell in row):
+                    headers = extract_headers(row)
+                    header_width = len(row)
+                    break
         
         # If no headers found, use first non-empty row
         if not headers and page["rows"]:
             headers = extract_headers(page["rows"][0])
         
-        # Process data rows
-        for row in page["rows"]:
-            if not row or not any(row):  # Skip empty rows
-                continue
-            if headers:  # Only process if we have headers
-                cleaned_row = clean_row(row, headers)
-                if cleaned_row:  # Only add non-empty rows
-                    all_rows.append(cleaned_row)
+        # Process data rows (only if we have headers)
+        if headers:
+            yield headers, page["rows"]
+
+def _iter_rows(pages: List[Tuple[List[str], List[List[str]]]]) -> Iterator[Dict[str, str]]:
+    """Clean and yield rows one page at a time"""
+    for headers, rows in pages:
+        yield from _clean_page_rows(rows, headers)
+
+def process_raw_json(file_path: Path, stream: bool = False) -> CleanedTable:
+    """
+    Process a raw JSON file and return a cleaned table.
+    With stream set, rows are cleaned lazily as the table is saved instead of held in a list.
+    """
+    raw_data = _json_loads(file_path.read_bytes())
+    
+    # Extract table name from filename
+    table_name = file_path.stem.replace('_raw', '')
+    
+    # Initialize metadata
+    metadata = {
+        "source_file": file_path.name,
+        "page_count": len(raw_data)
+    }
+    
+    # Resolve headers up front (cheap: no data rows are cleaned) so they are known before any row
+    pages = list(_iter_pages(raw_data))
+    headers = pages[-1][0] if pages else []
+    rows = _iter_rows(pages)
     
     return CleanedTable(
         name=table_name,
         headers=headers,
-        rows=all_rows,
+        rows=rows if stream else list(rows),
         metadata=metadata
     )
 
-def save_cleaned_data(table: CleanedTable, output_dir: Path):
-    """Save cleaned data to a JSON file"""
+def _to_payload(table: CleanedTable) -> dict:
+    """Build the JSON payload for a table, sharing its rows instead of deep-copying them"""
+    return {
+        "name": table.name,
+        "headers": table.headers,
+        "rows": table.rows,
+        "metadata": table.metadata
+    }
+
+def save_cleaned_data(table: CleanedTable, output_dir: Path, pretty: bool = False):
+    """Save cleaned data to a JSON file (compact unless pretty is set)"""
     output_dir.mkdir(parents=True, exist_ok=True)
     output_file = output_dir / f"{table.name}_cleaned.json"
     
-    with open(output_file, 'w') as f:
-        json.dump(asdict(table), f, indent=2)
+    if pretty:
+        output_file.write_bytes(_json_dumps(_to_payload(table) | {"rows": list(table.rows)}, pretty))
+        return
+    
+    # Compact output is written row by row, so streamed rows are never all held in memory.
+    # The bytes match a single compact dump of the whole payload.
+    with open(output_file, 'wb') as f:
+        f.write(_json_dumps({"name": table.name, "headers": table.headers})[:-1])
+        f.write(b',"rows":[')
+        for i, row in enumerate(table.rows):
+            if i:
+                f.write(b',')
+            f.write(_json_dumps(row))
+        f.write(b'],"metadata":')
+        f.write(_json_dumps(table.metadata))
+        f.write(b'}')
+
+def save_cleaned_parquet(table: CleanedTable, output_dir: Path):
+    """Save cleaned data as a zstd-compressed Parquet file (requires the optional pyarrow)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = output_dir / f"{table.name}_cleaned.parquet"
+    
+    # Columnar layout needs every row; keys from pages with an earlier schema get their own column
+    rows = list(table.rows)
+    columns = dict.fromkeys(table.headers)
+    for row in rows:
+        columns.update(dict.fromkeys(row))
+    
+    # Cells absent from a row are stored as nulls
+    data = {column: pa.array([row.get(column) for row in rows], type=pa.string()) for column in columns}
+    metadata = {"name": table.name, **{key: str(value) for key, value in table.metadata.items()}}
+    pq.write_table(pa.table(data, metadata=metadata), output_file, compression='zstd')
+
+def _clean_one(file_path: Path, output_dir: Path, pretty: bool = False,
+               parquet: bool = False) -> Tuple[str, Optional[str]]:
+    """Clean and save one raw JSON file, returning its name and any error message"""
+    try:
+        cleaned_table = process_raw_json(file_path, stream=True)
+        if parquet:
+            save_cleaned_parquet(cleaned_table, output_dir)
+        else:
+            save_cleaned_data(cleaned_table, output_dir, pretty)
+        return file_path.name, None
+    except Exception as e:
+        return file_path.name, str(e)
 
-def clean_all_tables():
+def clean_all_tables(pretty: bool = False, parquet: bool = False):
     """Clean all raw JSON files in the data directory"""
     data_dir = Path("mnt/data")
     output_dir = Path("mnt/data/cleaned")
     
-    # Process all raw JSON files
-    for file_path in data_dir.glob("*_raw.json"):
-        print(f"Processing {file_path.name}...")
-        try:
-            cleaned_table = process_raw_json(file_path)
-            save_cleaned_data(cleaned_table, output_dir)
-            print(f"Successfully cleaned {file_path.name}")
-        except Exception as e:
-            print(f"Error processing {file_path.name}: {e}")
+    # Files are independent, so each one is cleaned in its own worker process
+    files = sorted(data_dir.glob("*_raw.json"))
+    print(f"Processing {len(files)} files...")
+    with ProcessPoolExecutor() as executor:
+        for name, error in executor.map(_clean_one, files, repeat(output_dir), repeat(pretty),
+                                       repeat(parquet), chunksize=1):
+            if error is None:
+                print(f"Successfully cleaned {name}")
+            else:
+                print(f"Error processing {name}: {error}")
 
 if __name__ == "__main__":
-    clean_all_tables() 
\ No newline at end of file
+    # Cleaned files are read by code, so they are written compact unless --pretty is given.
+    # --parquet writes columnar Parquet files instead of JSON.
+    clean_all_tables(pretty="--pretty" in sys.argv[1:], parquet="--parquet" in sys.argv[1:]) 
\ No newline at end of file
@@ -2,22 +2,57 @@
 
 import pdfplumber
 import json
+from concurrent.futures import ProcessPoolExecutor
+
+# Optional: orjson serializes each page record faster than the stdlib json module
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
 
 # PDF scraper for tables in the Tasmanian Plant Quarantine Manual
 
+PDF_PATH = '../docs/tas_pqm.pdf'
+# Ensure the file name matches the table name in the data folder
+OUTPUT_PATH = '../mnt/data/new-table.json'
+
 pages = list(range(83, 87))  # adjust page numbers as needed, only extracts the table data
 
-all_tables = []
-with pdfplumber.open('../docs/tas_pqm.pdf') as pdf:
-    for p in pages:
-        tbl = pdf.pages[p].extract_table()
-        if tbl:
-            # Include page number for reference
-            all_tables.append({"page": p+1, "rows": tbl})
+# Each worker process opens its own handle; pdfplumber objects are not safe to share
+_pdf = None
 
-# Save raw output 
-# Ensure the file name matches the table name in the data folder
-with open('../mnt/data/new-table.json', 'w') as f: 
-    json.dump(all_tables, f, indent=2)
+def _open_pdf():
+    global _pdf
+    _pdf = pdfplumber.open(PDF_PATH)
+
+def _extract_page(p):
+    """Extract the table on page index p, returning (page number, rows or None)"""
+    page = _pdf.pages[p]
+    tbl = page.extract_table()
+    # Release the page's parsed objects before moving on
+    page.flush_cache()
+    return p+1, tbl
+
+def scrape_tables():
+    """Extract the tables on `pages` in parallel and stream them to OUTPUT_PATH"""
+    # Save raw output one page at a time so only finished pages are held in memory.
+    # The file is still a JSON array (one page record per line), as data_cleaner.py expects.
+    with ProcessPoolExecutor(initializer=_open_pdf) as executor, open(OUTPUT_PATH, 'wb') as f:
+        f.write(b'[\n')
+        first = True
+        # map() yields in page order, so the output matches a sequential scrape
+        for page_number, tbl in executor.map(_extract_page, pages):
+            if tbl:
+                if not first:
+                    f.write(b',\n')
+                # Include page number for reference
+                f.write(_json_dumps({"page": page_number, "rows": tbl}))
+                first = False
+        f.write(b'\n]\n')
+
+    print("Raw table extracts saved to mnt/data/")
 
-print("Raw table extracts saved to mnt/data/")
+if __name__ == "__main__":
+    scrape_tables()